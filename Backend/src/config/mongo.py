@@ -1,22 +1,21 @@
-from pymongo import MongoClient
+from pymongo import AsyncMongoClient
 from pymongo.errors import ConnectionFailure
-from pymongo import MongoClient
+from src.config.settings import settings
 import os
 
 
 # Read Mongo URL from env; default to localhost so devs running outside Docker don't need extra config
 mongo_url = os.getenv("MONGO_URL", "mongodb://localhost:27017/")
 
-try:
-    client = MongoClient(mongo_url, serverSelectionTimeoutMS=5000)
-    client.admin.command('ping')
-    print("MongoDB connection successful")
-except ConnectionFailure as e:
-    print(f"MongoDB connection failed: {e}")
-    raise
-except Exception as e:
-    print(f"Unexpected error connecting to MongoDB: {e}")
-    raise
+# One shared async client: it does not connect until first use, the app lifespan pings it on
+# startup (connect_mongo) and closes it on shutdown (close_mongo)
+client = AsyncMongoClient(
+    mongo_url,
+    serverSelectionTimeoutMS=5000,
+    maxPoolSize=settings.mongo_max_pool_size,
+    minPoolSize=settings.mongo_min_pool_size,
+    waitQueueTimeoutMS=settings.mongo_wait_queue_timeout_ms,
+)
 
 db = client["projectDYY"]
 
@@ -24,4 +23,19 @@ cred_collection = db["devices_cred"]
 info_collection = db["devices_info"]
 archive = db["archive"]
 groups_collection = db["groups"]
- 
\ No newline at end of file
+
+
+async def connect_mongo() -> None:
+    try:
+        await client.admin.command('ping')
+        print("MongoDB connection successful")
+    except ConnectionFailure as e:
+        print(f"MongoDB connection failed: {e}")
+        raise
+    except Exception as e:
+        print(f"Unexpected error connecting to MongoDB: {e}")
+        raise
+
+
+async def close_mongo() -> None:
+    await client.close()
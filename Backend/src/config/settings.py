@@ -3,7 +3,29 @@ from pydantic_settings import BaseSettings
 class Settings(BaseSettings):
     postgres_url: str 
     mongo_url: str
+    mongo_max_pool_size: int = 50
+    mongo_min_pool_size: int = 5
+    mongo_wait_queue_timeout_ms: int = 10000
     conf_interval: int = 60
+    conf_max_concurrency: int = 20
+    mbps_min_interval: int = 10
+    snmp_engine_pool_size: int = 4
+    snmp_target_idle_timeout: int = 900
+    snmp_target_ttl: int = 300
+    poll_max_concurrency: int = 100
+    poll_per_subnet_limit: int = 20
+    poll_subnet_prefix: int = 24
+    poll_device_timeout: int = 120
+    cli_max_workers: int = 32
+    ssh_session_idle_timeout: int = 300
+    ssh_session_max_age: int = 3600
+    cli_output_ttl: int = 30
+    parse_max_workers: int = 2
+    parse_offload_threshold: int = 1048576
+    junos_display_json: bool = False
+    config_change_markers: bool = True
+    config_keyframe_interval: int = 20
+    config_archive_keep: int = 0
 
     class Config:
         env_file = ".env"
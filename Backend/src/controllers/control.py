@@ -3,7 +3,7 @@ import asyncio
 
 
 device_interval: int = 3600  # seconds
-mbps_interval: int = 0  # seconds
+mbps_interval: int = 10  # seconds
 
 
 async def main_snmp() -> None:
@@ -22,8 +22,13 @@ class DeviceController:
 
 
     @staticmethod
-    async def get_config_history(ip: str) -> List[Dict[str, Any]]:
-        return await DeviceService.get_config_history(ip)
+    async def get_config_history_page(ip: str, limit: int, before_id: Optional[int]) -> Dict[str, Any]:
+        return await DeviceService.get_config_history_page(ip, limit, before_id)
+
+
+    @staticmethod
+    async def get_config_version(ip: str, archive_id: int) -> Optional[Dict[str, Any]]:
+        return await DeviceService.get_config_version(ip, archive_id)
 
 
     @staticmethod
@@ -31,6 +36,11 @@ class DeviceController:
         return await DeviceService.get_config_differences(ip)
 
 
+    @staticmethod
+    def get_cache_stats() -> Dict[str, Any]:
+        return DeviceService.get_cache_stats()
+
+
     @staticmethod
     async def refresh_by_ip(ip: str, method: str) -> Optional[bool]:
         return await DeviceService.refresh_by_ip(ip, method)
@@ -0,0 +1,26 @@
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncConnection
+
+
+# create_all only creates missing tables; columns and indexes added to existing tables
+# are applied here. Every statement must be idempotent, they run on each startup.
+SCHEMA_UPGRADES = [
+    "ALTER TABLE config ADD COLUMN IF NOT EXISTS config_hash VARCHAR(64)",
+    "ALTER TABLE config_archive ALTER COLUMN configuration DROP NOT NULL",
+    "ALTER TABLE config_archive ADD COLUMN IF NOT EXISTS payload BYTEA",
+    "ALTER TABLE config_archive ADD COLUMN IF NOT EXISTS is_keyframe BOOLEAN NOT NULL DEFAULT FALSE",
+    "CREATE INDEX IF NOT EXISTS ix_config_archive_mac_id ON config_archive (mac_address, id)",
+    "ALTER TABLE config ADD COLUMN IF NOT EXISTS size INTEGER",
+    "ALTER TABLE config ADD COLUMN IF NOT EXISTS lines_added INTEGER",
+    "ALTER TABLE config ADD COLUMN IF NOT EXISTS lines_deleted INTEGER",
+    "ALTER TABLE config_archive ADD COLUMN IF NOT EXISTS config_hash VARCHAR(64)",
+    "ALTER TABLE config_archive ADD COLUMN IF NOT EXISTS size INTEGER",
+    "ALTER TABLE config_archive ADD COLUMN IF NOT EXISTS lines_added INTEGER",
+    "ALTER TABLE config_archive ADD COLUMN IF NOT EXISTS lines_deleted INTEGER",
+    "CREATE INDEX IF NOT EXISTS ix_config_archive_mac_queried_at ON config_archive (mac_address, queried_at, id)",
+]
+
+
+async def upgrade_schema(conn: AsyncConnection) -> None:
+    for statement in SCHEMA_UPGRADES:
+        await conn.execute(text(statement))
@@ -2,9 +2,13 @@ from fastapi import FastAPI
 from src.middleware.cors import setup_cors
 from src.routes import devices, credentials, groups, white_list
 from src.config.postgres import engine
+from src.config.mongo import connect_mongo, close_mongo
 from src.db.postgres.base import Base
-from src.models.postgres.config import Config, ConfigArchive
+from src.db.postgres.migrations.schema import upgrade_schema
+from src.models.postgres.config import Config, ConfigArchive, ConfigDiff
 from src.models.postgres.white_list import WhiteList
+from src.utils.executors import shutdown_executors
+from src.services.sessions import SessionPool
 from contextlib import asynccontextmanager
 
 
@@ -13,9 +17,15 @@ async def lifespan(app: FastAPI):
     # Create Postgres tables without Alembic
     async with engine.begin() as conn:
         await conn.run_sync(Base.metadata.create_all)
+        await upgrade_schema(conn)
+    await connect_mongo()
     try:
         yield
     finally:
+        await SessionPool.close_all()
+        # Stops the CLI thread pool and the parse worker processes
+        shutdown_executors()
+        await close_mongo()
         await engine.dispose()
 
 
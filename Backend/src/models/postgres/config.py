@@ -1,5 +1,5 @@
 from src.db.postgres.base import Base
-from sqlalchemy import (Column, Integer, String, Boolean, DateTime, Text, UniqueConstraint, ForeignKey)
+from sqlalchemy import (Column, Integer, String, Boolean, DateTime, Text, UniqueConstraint, ForeignKey, JSON, Index, LargeBinary)
 
 
 class Config(Base):
@@ -9,12 +9,46 @@ class Config(Base):
     mac_address = Column(String(100), ForeignKey("devices.mac"), nullable=False, unique=True)
     configuration = Column(Text, nullable=False) 
     queried_at = Column(DateTime, nullable=False)
+    config_hash = Column(String(64), nullable=True)  # sha256 of the normalized configuration
+    size = Column(Integer, nullable=True)  # bytes of configuration
+    lines_added = Column(Integer, nullable=True)  # change summary against the previous version
+    lines_deleted = Column(Integer, nullable=True)
 
 
 class ConfigArchive(Base):
+    """
+    Previous versions of a configuration. payload holds either a zlib-compressed reverse delta
+    against the next newer version or, for keyframes, the compressed full text.
+    Archives written before delta storage keep their full text in configuration.
+    """
     __tablename__ = "config_archive"
+    __table_args__ = (
+        Index("ix_config_archive_mac_id", "mac_address", "id"),
+        # History pages: (mac_address, queried_at) with id as the keyset tiebreaker
+        Index("ix_config_archive_mac_queried_at", "mac_address", "queried_at", "id"),
+    )
 
     id = Column(Integer, primary_key=True)
     mac_address = Column(String(100), ForeignKey("devices.mac"), nullable=False)
-    configuration = Column(Text, nullable=False)
+    configuration = Column(Text, nullable=True)
     queried_at = Column(DateTime, nullable=False)
+    payload = Column(LargeBinary, nullable=True)
+    is_keyframe = Column(Boolean, nullable=False, default=False, server_default="false")
+    # Metadata copied from Config when the version is archived, so history pages never rebuild texts
+    config_hash = Column(String(64), nullable=True)
+    size = Column(Integer, nullable=True)
+    lines_added = Column(Integer, nullable=True)
+    lines_deleted = Column(Integer, nullable=True)
+
+
+class ConfigDiff(Base):
+    """Changes between a configuration and the version it replaced, computed once when it is saved."""
+    __tablename__ = "config_diff"
+    __table_args__ = (Index("ix_config_diff_mac_id", "mac_address", "id"),)
+
+    id = Column(Integer, primary_key=True)
+    mac_address = Column(String(100), ForeignKey("devices.mac"), nullable=False)
+    queried_at = Column(DateTime, nullable=False)  # queried_at of the newer configuration
+    added_lines = Column(JSON, nullable=False)
+    deleted_lines = Column(JSON, nullable=False)
+    added_lines_indexes = Column(JSON, nullable=False)
@@ -18,22 +18,36 @@ class DevicesRepo:
             }
 
             # Upsert by device_id so we keep interfaces current and archive the old doc
-            existing = info_collection.find_one({"device_id": device_id}, {"_id": 0})
+            existing = await info_collection.find_one({"device_id": device_id}, {"_id": 0})
             if existing:
-                archive.insert_one(existing)
-                info_collection.delete_one({"device_id": device_id})
+                await archive.insert_one(existing)
+                await info_collection.delete_one({"device_id": device_id})
 
-            info_collection.insert_one(latest_device_data)
+            await info_collection.insert_one(latest_device_data)
         except Exception as e:
             print(f"Error saving interfaces for device_id {device_id}: {e}")
             raise
 
 
 
+    @staticmethod
+    async def update_interfaces(device_id: int, interface_data: list, last_updated: str, raw_date: Any) -> bool:
+        """Replace the interface list of an existing device doc in place, without archiving it."""
+        try:
+            result = await info_collection.update_one(
+                {"device_id": device_id},
+                {"$set": {"interface": interface_data, "last updated at": last_updated, "raw date": raw_date}}
+            )
+            return result.matched_count > 0
+        except Exception as e:
+            print(f"Error updating interfaces for device_id {device_id}: {e}")
+            return False
+
+
     @staticmethod
     async def get_all_records() -> List[Dict[str, Any]]:
         try:
-            return list(info_collection.find({}, {"_id": 0}))
+            return await info_collection.find({}, {"_id": 0}).to_list()
         except Exception as e:
             print(f"Error getting all records: {e}")
             return []
@@ -42,7 +56,7 @@ class DevicesRepo:
     @staticmethod
     async def get_interfaces_by_device_id(device_id: int) -> Optional[Dict[str, Any]]:
         try:
-            return info_collection.find_one({"device_id": device_id}, {"_id": 0})
+            return await info_collection.find_one({"device_id": device_id}, {"_id": 0})
         except Exception as e:
             print(f"Error getting interfaces for device_id {device_id}: {e}")
             return None
@@ -51,7 +65,7 @@ class DevicesRepo:
     @staticmethod
     async def find_by_interface_ip(ip: str) -> List[Dict[str, Any]]:
         try:
-            return list(info_collection.find({"interface.ip_address": ip}, {"_id": 0}))
+            return await info_collection.find({"interface.ip_address": ip}, {"_id": 0}).to_list()
         except Exception as e:
             print(f"Error finding device by interface IP {ip}: {e}")
             return []
@@ -61,7 +75,7 @@ class DevicesRepo:
     async def get_interface_data() -> List[Dict[str, Any]]:
         try:
             # Return list of objects with device_id and interface list
-            docs = list(info_collection.find({}, {"device_id": 1, "interface": 1, "_id": 0}))
+            docs = await info_collection.find({}, {"device_id": 1, "interface": 1, "_id": 0}).to_list()
             return docs
         except Exception as e:
             print(f"Error getting interface data: {e}")
@@ -72,7 +86,7 @@ class DevicesRepo:
     async def update_mbps(ip: str, mbps_received: float, mbps_sent: float) -> None:
         try:
             # Update Mbps values for the matching interface in Mongo
-            info_collection.update_one(
+            await info_collection.update_one(
                 {"interface.ip_address": ip},
                 {"$set": {
                     "interface.$.mbps_received": mbps_received,
@@ -99,7 +113,7 @@ class DevicesRepo:
         """
         try:
             # Find the device by searching for a matching interface IP address
-            device = info_collection.find_one(
+            device = await info_collection.find_one(
                 {"interface": {"$elemMatch": {"ip_address": device_ip}}}
             )
             # If device doesn't exist, log and return None
@@ -119,7 +133,7 @@ class DevicesRepo:
                 print(f"Device doc for IP {device_ip} missing device_id")
                 return None
 
-            info_collection.update_one({"device_id": device_id}, {"$set": device})
+            await info_collection.update_one({"device_id": device_id}, {"$set": device})
 
             print(f"Successfully updated bandwidth data for device {device_ip}")
             # Return a minimal doc (no mac/hostname) but include device_id and interface list
@@ -8,11 +8,11 @@ class GroupsRepo:
     async def add_group(group_name: dict) -> Dict[str, Any]:
         try:
             # check if group already exists (e.g. by name)
-            existing = groups_collection.find_one({"group": group_name.get("group")})
+            existing = await groups_collection.find_one({"group": group_name.get("group")})
             if existing:
                 return {"success": False, "reason": "Group already exists"}
 
-            groups_collection.insert_one(group_name)
+            await groups_collection.insert_one(group_name)
             return {"success": True, "message": "Group added successfully"}
 
         except Exception as e:
@@ -23,7 +23,7 @@ class GroupsRepo:
     @staticmethod
     async def assign_device_to_group(device_mac: str, group_name: str) -> Dict[str, Any]:
         try:
-            result = groups_collection.update_one(
+            result = await groups_collection.update_one(
                 {"group": group_name},
                 {"$addToSet": {"device_macs": device_mac}}
             )
@@ -38,7 +38,7 @@ class GroupsRepo:
     @staticmethod
     async def get_one_group(group_name: str) -> Optional[Dict[str, Any]]:
         try:
-            group = groups_collection.find_one({"group": group_name}, {"_id": 0})
+            group = await groups_collection.find_one({"group": group_name}, {"_id": 0})
             return group
         except Exception as e:
             print(f"Error getting group {group_name}: {e}")
@@ -49,7 +49,7 @@ class GroupsRepo:
     async def get_all_groups() -> List[Dict[str, Any]]:
         try:
             # Remove "device_macs": 0 to include MAC addresses in results
-            group_list = list(groups_collection.find({}, {"_id": 0}))
+            group_list = await groups_collection.find({}, {"_id": 0}).to_list()
             return group_list
         except Exception as e:
             print(f"Error getting all groups: {e}")
@@ -59,7 +59,7 @@ class GroupsRepo:
     @staticmethod
     async def delete_device_from_group(device_mac: str, group_name: str) -> Dict[str, Any]:
         try:
-            result = groups_collection.update_one(
+            result = await groups_collection.update_one(
                 {"group": group_name},
                 {"$pull": {"device_macs": device_mac}}
             )
@@ -74,7 +74,7 @@ class GroupsRepo:
     @staticmethod
     async def delete_group(group_name: str) -> Dict[str, Any]:
         try:
-            result = groups_collection.delete_one({"group": group_name})
+            result = await groups_collection.delete_one({"group": group_name})
             if result.deleted_count == 0:
                 return {"success": False, "reason": "Group not found"}
             return {"success": True, "message": "Group deleted successfully"}
@@ -1,60 +1,177 @@
 from src.config.postgres import AsyncSessionLocal
-from src.models.postgres.config import Config, ConfigArchive
+from src.models.postgres.config import Config, ConfigArchive, ConfigDiff
 from sqlalchemy.future import select
+from sqlalchemy import delete, func, or_, tuple_
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
 from typing import Any, Dict, List, Optional, Tuple
 from datetime import datetime
 from src.repositories.postgres.credentials import CredentialsRepo
+from src.utils.config_diff import diff_lines, config_fingerprint, reverse_delta, apply_reverse_delta, compress_config, decompress_config
+from src.config.settings import settings
+from src.utils.executors import run_parse
 
 
 class ConfigRepo:
 
     @staticmethod
-    async def save_config(mac_address: str, configuration: str, queried_at: datetime) -> None:
+    def config_lines(configuration: Optional[str]) -> List[str]:
+        """Stripped, non-empty lines of a configuration, as compared by the diff."""
+        if not configuration:
+            return []
+        return [line.strip() for line in configuration.split('\n') if line.strip()]
+
+
+    @staticmethod
+    def compute_differences(archived_config: Optional[str], current_config: Optional[str]) -> Dict[str, List[Any]]:
+        current_lines = ConfigRepo.config_lines(current_config)
+        archived_lines = ConfigRepo.config_lines(archived_config)
+
+        # Positional diff: indexes point at the actual changed lines, also for repeated lines like "!"
+        deleted_lines_indexes, added_lines_indexes = diff_lines(archived_lines, current_lines)
+        return {
+            "added_lines": [current_lines[index] for index in added_lines_indexes],
+            "deleted_lines": [archived_lines[index] for index in deleted_lines_indexes],
+            "full_config_lines": current_lines,
+            "added_lines_indexes": added_lines_indexes,
+        }
+
+
+    @staticmethod
+    def archive_change(older: str, newer: str, keyframe: bool) -> Tuple[bytes, bool, Dict[str, List[Any]]]:
+        """
+        Archive payload of the replaced configuration (compressed keyframe or reverse delta
+        against the new one) and the differences between the two, computed together so both
+        run in one parse-pool hop for large configurations.
+        """
+        payload = compress_config(older) if keyframe else reverse_delta(newer, older)
+        return payload, keyframe, ConfigRepo.compute_differences(older, newer)
+
+
+    @staticmethod
+    async def save_config(mac_address: str, configuration: str, queried_at: datetime, config_hash: Optional[str] = None) -> bool:
         """
         Save device configuration. If a configuration already exists for this MAC address,
         archive the old one first before saving the new one.
+        The current row is locked for the whole save, so concurrent captures of the same device
+        (device refresh and config poll) archive one after the other. Returns False when the
+        stored configuration already has this hash, e.g. a concurrent capture saved it first.
         """
+        if config_hash is None:
+            config_hash = await run_parse(config_fingerprint, configuration)
+        size = len(configuration.encode("utf-8", "surrogateescape"))
         try:
-            async with AsyncSessionLocal() as session:
-                # Check if a config already exists for this MAC
-                q = select(Config).where(Config.mac_address == mac_address)
-                res = await session.execute(q)
-                existing_config = res.scalar_one_or_none()
-                
-                if existing_config:
-                    # Archive the old configuration
-                    archive_entry = ConfigArchive(
-                        mac_address=mac_address,
-                        configuration=existing_config.configuration,
-                        queried_at=existing_config.queried_at
-                    )
-                    session.add(archive_entry)
-                    
-                    # Update the existing config with new data
-                    existing_config.configuration = configuration
-                    existing_config.queried_at = queried_at
-                    session.add(existing_config)
-                else:
-                    # Create new config entry
-                    new_config = Config(
-                        mac_address=mac_address,
-                        configuration=configuration,
-                        queried_at=queried_at
-                    )
-                    session.add(new_config)
-                
-                await session.commit()
-                print(f"Successfully saved configuration for device {mac_address}")
-                
+            for attempt in range(2):
+                try:
+                    async with AsyncSessionLocal() as session:
+                        return await ConfigRepo.write_config(session, mac_address, configuration, queried_at, config_hash, size)
+                except IntegrityError:
+                    if attempt:
+                        raise
+                    # A concurrent capture inserted the first configuration; retry to archive against it
+                    print(f"Configuration of device {mac_address} was inserted concurrently, retrying")
+            return False
+
         except Exception as e:
             print(f"Error saving configuration for device {mac_address}: {e}")
-            try:
-                await session.rollback()
-            except Exception:
-                pass
             raise
 
 
+    @staticmethod
+    async def write_config(session: AsyncSession, mac_address: str, configuration: str, queried_at: datetime, config_hash: str, size: int) -> bool:
+        # Lock the current configuration until commit; a concurrent save waits here
+        q = select(Config).where(Config.mac_address == mac_address).with_for_update()
+        res = await session.execute(q)
+        existing_config = res.scalar_one_or_none()
+
+        if existing_config:
+            # Re-checked under the lock: the hash read before the save may be stale
+            if existing_config.config_hash == config_hash:
+                await session.rollback()
+                return False
+
+            # Archive the old configuration as a reverse delta against the new one,
+            # or as a compressed keyframe every config_keyframe_interval versions.
+            # The diff work is offloaded for large configurations.
+            keyframe = await ConfigRepo.needs_keyframe(session, mac_address)
+            payload, is_keyframe, differences = await run_parse(
+                ConfigRepo.archive_change, existing_config.configuration, configuration, keyframe
+            )
+            archive_entry = ConfigArchive(
+                mac_address=mac_address,
+                configuration=None,
+                queried_at=existing_config.queried_at,
+                payload=payload,
+                is_keyframe=is_keyframe,
+                config_hash=existing_config.config_hash,
+                size=existing_config.size if existing_config.size is not None else len(existing_config.configuration.encode("utf-8", "surrogateescape")),
+                lines_added=existing_config.lines_added,
+                lines_deleted=existing_config.lines_deleted
+            )
+            session.add(archive_entry)
+
+            # Store what changed once, so diff reads and alerts don't reload both texts
+            session.add(ConfigDiff(
+                mac_address=mac_address,
+                queried_at=queried_at,
+                added_lines=differences["added_lines"],
+                deleted_lines=differences["deleted_lines"],
+                added_lines_indexes=differences["added_lines_indexes"]
+            ))
+
+            # Update the existing config with new data
+            existing_config.configuration = configuration
+            existing_config.queried_at = queried_at
+            existing_config.config_hash = config_hash
+            existing_config.size = size
+            existing_config.lines_added = len(differences["added_lines"])
+            existing_config.lines_deleted = len(differences["deleted_lines"])
+            session.add(existing_config)
+        else:
+            # Create new config entry
+            new_config = Config(
+                mac_address=mac_address,
+                configuration=configuration,
+                queried_at=queried_at,
+                config_hash=config_hash,
+                size=size
+            )
+            session.add(new_config)
+
+        if settings.config_archive_keep > 0:
+            await session.flush()
+            await ConfigRepo.prune_archives(session, mac_address, settings.config_archive_keep)
+
+        await session.commit()
+        print(f"Successfully saved configuration for device {mac_address}")
+        return True
+
+
+    @staticmethod
+    async def get_config_hash(mac_address: str) -> Optional[str]:
+        """
+        Fingerprint of the device's current configuration, or None if none is stored.
+        Only the hash column is read; configurations stored before the column existed
+        are fingerprinted once and backfilled.
+        """
+        try:
+            async with AsyncSessionLocal() as session:
+                q = select(Config.id, Config.config_hash).where(Config.mac_address == mac_address)
+                row = (await session.execute(q)).first()
+                if row is None:
+                    return None
+                if row.config_hash:
+                    return row.config_hash
+
+                config = await session.get(Config, row.id)
+                config.config_hash = config_fingerprint(config.configuration)
+                await session.commit()
+                return config.config_hash
+        except Exception as e:
+            print(f"Error retrieving configuration hash for device {mac_address}: {e}")
+            return None
+
+
     @staticmethod
     async def get_latest_config(mac_address: str) -> Optional[Dict[str, Any]]:
         """
@@ -80,28 +197,154 @@ class ConfigRepo:
 
 
     @staticmethod
-    async def get_config_history(mac_address: str) -> List[Dict[str, Any]]:
+    def archive_text(archive: ConfigArchive, newer_text: str) -> str:
+        """Full text of an archived version, given the text of the version saved after it."""
+        if archive.configuration is not None:
+            return archive.configuration
+        if archive.is_keyframe:
+            return decompress_config(archive.payload)
+        return apply_reverse_delta(newer_text, archive.payload)
+
+
+    @staticmethod
+    async def needs_keyframe(session: AsyncSession, mac_address: str) -> bool:
+        """True when the next archive would make the delta chain since the last full text too long."""
+        last_keyframe = (
+            select(func.coalesce(func.max(ConfigArchive.id), 0))
+            .where(ConfigArchive.mac_address == mac_address)
+            .where(or_(ConfigArchive.is_keyframe, ConfigArchive.configuration.is_not(None)))
+            .scalar_subquery()
+        )
+        q = (
+            select(func.count())
+            .select_from(ConfigArchive)
+            .where(ConfigArchive.mac_address == mac_address, ConfigArchive.id > last_keyframe)
+        )
+        deltas = (await session.execute(q)).scalar_one()
+        return deltas + 1 >= settings.config_keyframe_interval
+
+
+    @staticmethod
+    async def prune_archives(session: AsyncSession, mac_address: str, keep_count: int) -> int:
+        """
+        Delete all but the newest keep_count archives (and stored diffs) of a device in set-based statements.
+        Reverse deltas only depend on newer versions, so dropping the oldest ones never breaks the chain.
+        """
+        if keep_count < 1:
+            return 0
+        cutoffs = []
+        for model in (ConfigArchive, ConfigDiff):
+            cutoffs.append(
+                select(model.id)
+                .where(model.mac_address == mac_address)
+                .order_by(model.id.desc())
+                .offset(keep_count - 1)
+                .limit(1)
+                .scalar_subquery()
+            )
+        archive_cutoff, diff_cutoff = cutoffs
+
+        res = await session.execute(
+            delete(ConfigArchive)
+            .where(ConfigArchive.mac_address == mac_address, ConfigArchive.id < archive_cutoff)
+            .execution_options(synchronize_session=False)
+        )
+        await session.execute(
+            delete(ConfigDiff)
+            .where(ConfigDiff.mac_address == mac_address, ConfigDiff.id < diff_cutoff)
+            .execution_options(synchronize_session=False)
+        )
+        return res.rowcount or 0
+
+
+    @staticmethod
+    async def get_history_page(mac_address: str, limit: int = 50, before_id: Optional[int] = None) -> Dict[str, Any]:
         """
-        Retrieve all archived configurations for a device (configuration history).
+        One page of configuration history metadata, newest first, without configuration texts.
+        Keyset pagination: pass the returned next_before_id to get the following page.
         """
         try:
             async with AsyncSessionLocal() as session:
-                q = select(ConfigArchive).where(ConfigArchive.mac_address == mac_address).order_by(ConfigArchive.queried_at.desc())
-                res = await session.execute(q)
-                archives = res.scalars().all()
-                
-                return [
+                q = (
+                    select(
+                        ConfigArchive.id,
+                        ConfigArchive.queried_at,
+                        func.coalesce(ConfigArchive.size, func.octet_length(ConfigArchive.configuration)).label("size"),
+                        ConfigArchive.config_hash,
+                        ConfigArchive.lines_added,
+                        ConfigArchive.lines_deleted
+                    )
+                    .where(ConfigArchive.mac_address == mac_address)
+                    .order_by(ConfigArchive.queried_at.desc(), ConfigArchive.id.desc())
+                    .limit(limit + 1)
+                )
+                if before_id is not None:
+                    cursor = (
+                        select(ConfigArchive.queried_at)
+                        .where(ConfigArchive.mac_address == mac_address, ConfigArchive.id == before_id)
+                        .scalar_subquery()
+                    )
+                    q = q.where(tuple_(ConfigArchive.queried_at, ConfigArchive.id) < tuple_(cursor, before_id))
+
+                rows = (await session.execute(q)).all()
+                items = [
                     {
-                        "id": archive.id,
-                        "mac_address": archive.mac_address,
-                        "configuration": archive.configuration,
-                        "queried_at": archive.queried_at
+                        "id": row.id,
+                        "mac_address": mac_address,
+                        "queried_at": row.queried_at,
+                        "size": row.size,
+                        "config_hash": row.config_hash,
+                        "lines_added": row.lines_added,
+                        "lines_deleted": row.lines_deleted
                     }
-                    for archive in archives
+                    for row in rows[:limit]
                 ]
+                return {
+                    "items": items,
+                    "next_before_id": items[-1]["id"] if len(rows) > limit else None
+                }
         except Exception as e:
-            print(f"Error retrieving configuration history for device {mac_address}: {e}")
-            return []
+            print(f"Error retrieving configuration history page for device {mac_address}: {e}")
+            return {"items": [], "next_before_id": None}
+
+
+    @staticmethod
+    async def get_config_version(mac_address: str, archive_id: int) -> Optional[Dict[str, Any]]:
+        """
+        Rebuild one archived version. Only the rows between it and the nearest newer keyframe
+        (or the current configuration) are read, at most config_keyframe_interval of them.
+        """
+        try:
+            async with AsyncSessionLocal() as session:
+                keyframe_id = (await session.execute(
+                    select(func.min(ConfigArchive.id))
+                    .where(ConfigArchive.mac_address == mac_address, ConfigArchive.id >= archive_id)
+                    .where(or_(ConfigArchive.is_keyframe, ConfigArchive.configuration.is_not(None)))
+                )).scalar_one_or_none()
+
+                q = select(ConfigArchive).where(ConfigArchive.mac_address == mac_address, ConfigArchive.id >= archive_id)
+                if keyframe_id is not None:
+                    q = q.where(ConfigArchive.id <= keyframe_id)
+                    newer_text = ""
+                else:
+                    q_current = select(Config.configuration).where(Config.mac_address == mac_address)
+                    newer_text = (await session.execute(q_current)).scalar_one_or_none() or ""
+                archives = (await session.execute(q.order_by(ConfigArchive.id.desc()))).scalars().all()
+
+                if not archives or archives[-1].id != archive_id:
+                    return None
+                for archive in archives:
+                    newer_text = ConfigRepo.archive_text(archive, newer_text)
+
+                return {
+                    "id": archive_id,
+                    "mac_address": mac_address,
+                    "configuration": newer_text,
+                    "queried_at": archives[-1].queried_at
+                }
+        except Exception as e:
+            print(f"Error retrieving configuration version {archive_id} for device {mac_address}: {e}")
+            return None
 
 
     @staticmethod
@@ -112,17 +355,10 @@ class ConfigRepo:
         """
         try:
             async with AsyncSessionLocal() as session:
-                q = select(ConfigArchive).where(ConfigArchive.mac_address == mac_address).order_by(ConfigArchive.archived_at.desc())
-                res = await session.execute(q)
-                archives = res.scalars().all()
-                
-                # Delete archives beyond the keep_count
-                if len(archives) > keep_count:
-                    to_delete = archives[keep_count:]
-                    for archive in to_delete:
-                        await session.delete(archive)
-                    await session.commit()
-                    print(f"Deleted {len(to_delete)} old configuration archives for {mac_address}")
+                deleted = await ConfigRepo.prune_archives(session, mac_address, keep_count)
+                await session.commit()
+                if deleted:
+                    print(f"Deleted {deleted} old configuration archives for {mac_address}")
         except Exception as e:
             print(f"Error cleaning up old archives for device {mac_address}: {e}")
             try:
@@ -131,6 +367,32 @@ class ConfigRepo:
                 pass
 
 
+    @staticmethod
+    async def get_latest_diff(mac_address: str) -> Optional[Dict[str, Any]]:
+        """
+        The stored changes of the device's latest configuration save (one indexed lookup).
+        """
+        try:
+            async with AsyncSessionLocal() as session:
+                q = select(ConfigDiff).where(ConfigDiff.mac_address == mac_address).order_by(ConfigDiff.id.desc()).limit(1)
+                res = await session.execute(q)
+                diff = res.scalar_one_or_none()
+
+                if diff:
+                    return {
+                        "id": diff.id,
+                        "mac_address": diff.mac_address,
+                        "queried_at": diff.queried_at,
+                        "added_lines": diff.added_lines,
+                        "deleted_lines": diff.deleted_lines,
+                        "added_lines_indexes": diff.added_lines_indexes
+                    }
+                return None
+        except Exception as e:
+            print(f"Error retrieving configuration diff for device {mac_address}: {e}")
+            return None
+
+
     @staticmethod
     async def get_config_differences(ip: str) -> Optional[List[List[str]]]:
         """
@@ -143,6 +405,8 @@ class ConfigRepo:
             A list containing two lists: [added_lines, deleted_lines]
             - added_lines: Lines that exist in the current config but not in the archived config
             - deleted_lines: Lines that exist in the archived config but not in the current config
+            - full_config_lines: The stripped, non-empty lines of the current config
+            - added_lines_indexes: Position of each added line in full_config_lines
             Returns None if either config cannot be retrieved or if there's an error.
         """
         try:
@@ -163,10 +427,21 @@ class ConfigRepo:
                     return None
                 
                 current_config_text = current_config.configuration
-            
+
+            # Use the diff stored when this configuration was saved
+            stored_diff = await ConfigRepo.get_latest_diff(mac_address)
+            if stored_diff and stored_diff["queried_at"] == current_config.queried_at:
+                return (
+                    stored_diff["added_lines"],
+                    stored_diff["deleted_lines"],
+                    ConfigRepo.config_lines(current_config_text),
+                    stored_diff["added_lines_indexes"]
+                )
+
+            # Configurations saved before diffs were stored: compare against the latest archive
             # Get the latest archived configuration
             async with AsyncSessionLocal() as session:
-                q = select(ConfigArchive).where(ConfigArchive.mac_address == mac_address).order_by(ConfigArchive.queried_at.desc())
+                q = select(ConfigArchive).where(ConfigArchive.mac_address == mac_address).order_by(ConfigArchive.id.desc()).limit(1)
                 res = await session.execute(q)
                 latest_archive = res.scalars().first()
                 
@@ -174,46 +449,15 @@ class ConfigRepo:
                     print(f"No archived configuration found for MAC: {mac_address}")
                     return None
                 
-                archived_config_text = latest_archive.configuration
-            
-            # Split configurations into lists of lines
-            current_lines = current_config_text.split('\n') if current_config_text else []
-            archived_lines = archived_config_text.split('\n') if archived_config_text else []
-            
-            # Strip whitespace from each line for comparison
-            current_lines = [line.strip() for line in current_lines if line.strip()]
-            archived_lines = [line.strip() for line in archived_lines if line.strip()]
-            
-            # Create mutable copies for comparison
-            current_lines_copy = current_lines.copy()
-            archived_lines_copy = archived_lines.copy()
-            
-            # Compare and remove matching lines
-            for line in current_lines:
-                if line in archived_lines_copy:
-                    current_lines_copy.remove(line)
-                    archived_lines_copy.remove(line)
-            
-            # current_lines_copy now contains added lines (in current but not in archive)
-            # archived_lines_copy now contains deleted lines (in archive but not in current)
-            added_lines = current_lines_copy
-            deleted_lines = archived_lines_copy
+                archived_config_text = ConfigRepo.archive_text(latest_archive, current_config_text)
             
-            # Find the indexes of added lines in the original current_lines variable
-            added_lines_indexes = []
-            for added_line in added_lines:
-                if added_line in current_lines:
-                    index = current_lines.index(added_line)
-                    added_lines_indexes.append(index)
-
-            # Find the indexes of deleted lines in the original deleted_lines variable
-            # deleted_lines_indexes = []
-            # for deleted_line in deleted_lines:
-            #     if deleted_line in archived_lines:
-            #         index = archived_lines.index(deleted_line)
-            #         deleted_lines_indexes.append(index)        
-
-            return added_lines, deleted_lines, current_lines, added_lines_indexes
+            differences = ConfigRepo.compute_differences(archived_config_text, current_config_text)
+            return (
+                differences["added_lines"],
+                differences["deleted_lines"],
+                differences["full_config_lines"],
+                differences["added_lines_indexes"]
+            )
             
         except Exception as e:
             print(f"Error comparing configurations for IP {ip}: {e}")
@@ -55,6 +55,41 @@ class DevicesRepo:
             raise
 
 
+    @staticmethod
+    async def mark_active(mac_address: str, last_updated: str, raw_date: Any) -> Optional[int]:
+        """
+        Refresh only the timestamps and status of an existing device (used when a poll returned
+        the same data as before). Returns the device id, or None if the device does not exist.
+        Database errors are logged and re-raised, like save_info.
+        """
+        try:
+            async with AsyncSessionLocal() as session:
+                q = select(Device).where(Device.mac == mac_address)
+                res = await session.execute(q)
+                existing = res.scalar_one_or_none()
+                if not existing:
+                    return None
+                existing.last_updated = last_updated
+                existing.raw_date = raw_date
+                existing.status = "active"
+                session.add(existing)
+                await session.commit()
+                return existing.id
+        except Exception as e:
+            print(f"Error marking device {mac_address} active: {e}")
+            raise
+
+
+    @staticmethod
+    async def update_interfaces(device_id: int, interface_data: list, last_updated: str, raw_date: Any) -> bool:
+        """Update the interfaces stored in Mongo for a device without archiving the previous doc."""
+        try:
+            return await MongoDevicesRepo.update_interfaces(device_id, interface_data, last_updated, raw_date)
+        except Exception as e:
+            print(f"Error updating interfaces of device {device_id}: {e}")
+            return False
+
+
     @staticmethod
     async def get_all_records() -> List[Dict[str, Any]]:
         """Return combined records: postgres fields merged with interfaces from Mongo."""
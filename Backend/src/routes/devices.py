@@ -1,6 +1,7 @@
-from fastapi import APIRouter, HTTPException
+from fastapi import APIRouter, HTTPException, Query
+from fastapi.responses import StreamingResponse
 from src.controllers.devices import DeviceController
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Optional, Iterator
 import asyncio
 
 
@@ -28,6 +29,14 @@ async def get_one_record(ip: str) -> List[Dict[str, Any]]:
         raise HTTPException(status_code=500, detail=f"Failed to retrieve record: {str(e)}")
 
 
+@router.get("/cache/stats")
+async def get_cache_stats() -> Dict[str, Any]:
+    """
+    Hit/miss counters of the CLI parse cache and the command output cache, and open SSH sessions.
+    """
+    return DeviceController.get_cache_stats()
+
+
 @router.post("/refresh_one")
 async def refresh_by_ip(ip: str, method: str = "snmp") -> Dict[str, Any]:
     try:
@@ -67,17 +76,41 @@ async def get_current_config(ip: str) -> Dict[str, Any]:
 
 
 @router.get("/config/history")
-async def get_config_history(ip: str) -> List[Dict[str, Any]]:
+async def get_config_history(ip: str, limit: int = Query(50, ge=1, le=500), before_id: Optional[int] = None) -> Dict[str, Any]:
     """
-    Retrieve the configuration history (archived configurations) for a device by IP address.
+    Retrieve one page of configuration history metadata for a device by IP address, newest first.
+    Pass next_before_id as before_id to get the next page. Bodies are served by /config/history/{archive_id}.
     """
     try:
-        history = await DeviceController.get_config_history(ip)
-        return history
+        return await DeviceController.get_config_history_page(ip, limit, before_id)
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Failed to retrieve configuration history: {str(e)}")
 
 
+def iter_chunks(text: str, chunk_size: int = 65536) -> Iterator[str]:
+    for start in range(0, len(text), chunk_size):
+        yield text[start:start + chunk_size]
+
+
+@router.get("/config/history/{archive_id}")
+async def get_config_version(ip: str, archive_id: int, stream: bool = False) -> Any:
+    """
+    Retrieve the full text of one archived configuration.
+    With stream=true the configuration is sent as chunked text/plain instead of JSON.
+    """
+    try:
+        version = await DeviceController.get_config_version(ip, archive_id)
+        if not version:
+            raise HTTPException(status_code=404, detail=f"Configuration version {archive_id} not found for device at IP: {ip}")
+        if stream:
+            return StreamingResponse(iter_chunks(version["configuration"]), media_type="text/plain")
+        return version
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Failed to retrieve configuration version: {str(e)}")
+
+
 @router.get("/config/differences")
 async def get_config_differences(ip: str) -> Dict[str, Any]:
     """
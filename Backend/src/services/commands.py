@@ -0,0 +1,76 @@
+from src.config.settings import settings
+from typing import Optional, Dict, Tuple, Any
+import threading
+import time
+
+
+class CommandPlanner:
+    """
+    Per-device cache of CLI command outputs.
+    The info, Mbps and config loops ask for overlapping commands ("show interfaces",
+    "show running-config", ...); each distinct command is sent to a device at most once
+    per `cli_output_ttl` seconds and the output is shared by every parser that needs it.
+    Callers hold the device's SessionPool lock, so a device never runs the same command twice
+    concurrently. `send` runs on CLI executor threads while the event loop prunes the cache, so
+    every access to `outputs` holds `lock`.
+    """
+
+    # (ip, command) -> (monotonic time the output was captured, output)
+    outputs: Dict[Tuple[str, str], Tuple[float, str]] = {}
+    hits: int = 0
+    misses: int = 0
+    last_sweep: float = 0.0
+    lock: threading.Lock = threading.Lock()
+
+
+    @staticmethod
+    def send(net_connect: Any, command: str, max_age: Optional[float] = None) -> str:
+        """Return the output of `command`, running it only if no fresh output is cached."""
+        now = time.monotonic()
+        CommandPlanner.evict_stale(now)
+
+        max_age = settings.cli_output_ttl if max_age is None else max_age
+        key = (net_connect.host, command)
+        with CommandPlanner.lock:
+            cached = CommandPlanner.outputs.get(key)
+        if cached is not None and now - cached[0] <= max_age:
+            CommandPlanner.hits += 1
+            return cached[1]
+
+        CommandPlanner.misses += 1
+        output = net_connect.send_command(command)
+        with CommandPlanner.lock:
+            CommandPlanner.outputs[key] = (time.monotonic(), output)
+        return output
+
+
+    @staticmethod
+    def forget(ip: str) -> None:
+        """Drop the cached outputs of a device (credentials changed, unreachable or removed)."""
+        with CommandPlanner.lock:
+            for key in [key for key in CommandPlanner.outputs if key[0] == ip]:
+                CommandPlanner.outputs.pop(key, None)
+
+
+    @staticmethod
+    def ips() -> set:
+        """IPs that currently have cached outputs."""
+        with CommandPlanner.lock:
+            return {key[0] for key in CommandPlanner.outputs}
+
+
+    @staticmethod
+    def evict_stale(now: float) -> None:
+        """Drop outputs that can no longer be served; runs at most once a minute."""
+        if now - CommandPlanner.last_sweep < 60:
+            return
+        CommandPlanner.last_sweep = now
+        with CommandPlanner.lock:
+            for key, (captured, _) in list(CommandPlanner.outputs.items()):
+                if now - captured > settings.cli_output_ttl:
+                    CommandPlanner.outputs.pop(key, None)
+
+
+    @staticmethod
+    def stats() -> Dict[str, Any]:
+        return {"cached_outputs": len(CommandPlanner.outputs), "hits": CommandPlanner.hits, "misses": CommandPlanner.misses}
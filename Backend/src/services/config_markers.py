@@ -0,0 +1,44 @@
+from typing import Optional, Dict, Any
+
+
+class ConfigMarkers:
+    """
+    Last configuration change marker seen per device (Cisco "Last configuration change" line,
+    IOS XR / Junos latest commit, or SNMP ccmHistoryRunningLastChanged).
+    The full configuration is only transferred when a device's marker has moved.
+    A marker is remembered only after the configuration it belongs to was captured, so a failed
+    capture is retried on the next poll.
+    """
+
+    # ip -> marker of the last captured configuration
+    markers: Dict[str, str] = {}
+    skipped: int = 0
+    fetched: int = 0
+
+
+    @staticmethod
+    def changed(ip: str, marker: Optional[str]) -> bool:
+        """True when the configuration has to be fetched (marker moved or unknown)."""
+        if marker is not None and ConfigMarkers.markers.get(ip) == marker:
+            ConfigMarkers.skipped += 1
+            return False
+        ConfigMarkers.fetched += 1
+        return True
+
+
+    @staticmethod
+    def remember(ip: str, marker: Optional[str]) -> None:
+        if marker is None:
+            ConfigMarkers.markers.pop(ip, None)
+        else:
+            ConfigMarkers.markers[ip] = marker
+
+
+    @staticmethod
+    def forget(ip: str) -> None:
+        ConfigMarkers.markers.pop(ip, None)
+
+
+    @staticmethod
+    def stats() -> Dict[str, Any]:
+        return {"devices": len(ConfigMarkers.markers), "skipped": ConfigMarkers.skipped, "fetched": ConfigMarkers.fetched}
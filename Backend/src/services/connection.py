@@ -2,31 +2,50 @@ from netmiko import ConnectHandler
 from netmiko.exceptions import NetmikoTimeoutException, NetmikoAuthenticationException
 from datetime import datetime
 import re 
-from pysnmp.hlapi.v3arch.asyncio import get_cmd, bulk_cmd, SnmpEngine, CommunityData, UdpTransportTarget, ContextData, ObjectType, ObjectIdentity
-import asyncio
-from typing import Optional, Dict, Tuple, Any
+from pysnmp.hlapi.v3arch.asyncio import get_cmd, bulk_cmd, SnmpEngine, ContextData, ObjectType, ObjectIdentity
+from pysnmp.proto.rfc1905 import NoSuchObject, NoSuchInstance, EndOfMibView
+from typing import Optional, Dict, Tuple, Any, List, AsyncIterator, Callable
+from src.utils.snmp import SnmpEnginePool
+from src.utils.executors import run_in_cli_executor
+from src.services.commands import CommandPlanner
+from src.services.extraction import ExtractionService
+from src.utils.config_diff import normalize_config
+from src.config.settings import settings
 
 
 class ConnectionService:
 
-    snmp_engines_dict: Dict[str, SnmpEngine] = {}
+    # Max varbinds packed into a single GET PDU. Keeps typical responses well under
+    # the 1472-byte UDP payload most agents use as msgMaxSize; bigger requests are
+    # split automatically when the agent answers with tooBig.
+    snmp_max_oids_per_pdu: int = 24
+
+    # GETBULK tuning for table walks. max-repetitions starts at the default and is
+    # re-sized after every response so that (repetitions x columns) varbinds fit in
+    # roughly snmp_bulk_response_budget bytes.
+    snmp_bulk_max_repetitions: int = 25
+    snmp_bulk_repetitions_limit: int = 100
+    snmp_bulk_response_budget: int = 1400
+
+    # Default (empty) SNMP context, shared by every request
+    snmp_context: ContextData = ContextData()
+
     @staticmethod
     def get_snmp_engine(ip: str) -> SnmpEngine:
-        # Get or create a dedicated SnmpEngine for each device.
-        if ip not in ConnectionService.snmp_engines_dict:
-            ConnectionService.snmp_engines_dict[ip] = SnmpEngine()
-        return ConnectionService.snmp_engines_dict[ip]
+        # Devices share a small pool of engines instead of one SnmpEngine each
+        return SnmpEnginePool.get_engine(ip)
     
 
     @staticmethod
     async def get_snmp(ip: str, snmp_password: str, oid: str) -> Optional[Any]:
         try:
             # Perform SNMP GET request
+            engine, auth, transport = await SnmpEnginePool.target(ip, snmp_password)
             errorIndication, errorStatus, errorIndex, varBinds = await get_cmd(
-                ConnectionService.get_snmp_engine(ip),
-                CommunityData(snmp_password, mpModel=1, securityName=f"area-{ip}"),
-                await UdpTransportTarget.create((ip, 161)),
-                ContextData(),
+                engine,
+                auth,
+                transport,
+                ConnectionService.snmp_context,
                 ObjectType(ObjectIdentity(oid))
             )
 
@@ -45,50 +64,233 @@ class ConnectionService:
 
 
     @staticmethod
-    async def get_interfaces_indexes(ip: str, snmp_password: Optional[str]) -> Optional[Dict[str, str]]:
-        if snmp_password is None:
-            print(f"No SNMP password provided for device {ip}")
-            return None
-        
-        try:
-            # Perform SNMP BULK request - stop at end of ifDescr table (1.3.6.1.2.1.2.2.1.2)
-            # We need to use a lower max-repetitions to avoid walking into the next OID tree
+    async def get_many(ip: str, snmp_password: str, oids: List[str], max_oids_per_pdu: Optional[int] = None) -> Dict[str, Any]:
+        """
+        Fetch many OIDs using as few GET PDUs as possible.
+        OIDs are packed into PDUs of up to `max_oids_per_pdu` varbinds; a PDU the agent
+        rejects as tooBig is split in half and retried.
+        Returns a dict keyed by the requested OID string. OIDs the agent does not have
+        (noSuchObject/noSuchInstance) or that failed are left out.
+        """
+        results: Dict[str, Any] = {}
+        if not oids:
+            return results
+
+        chunk_size = max_oids_per_pdu or ConnectionService.snmp_max_oids_per_pdu
+        # Drop duplicates but keep the caller's order
+        unique_oids = list(dict.fromkeys(oids))
+        pending = [unique_oids[i:i + chunk_size] for i in range(0, len(unique_oids), chunk_size)]
+
+        while pending:
+            chunk = pending.pop(0)
+            try:
+                engine, auth, transport = await SnmpEnginePool.target(ip, snmp_password)
+                errorIndication, errorStatus, errorIndex, varBinds = await get_cmd(
+                    engine,
+                    auth,
+                    transport,
+                    ConnectionService.snmp_context,
+                    *[ObjectType(ObjectIdentity(oid)) for oid in chunk]
+                )
+            except Exception as e:
+                print(f"Exception during SNMP multi-GET for {ip}: {e}")
+                continue
+
+            if errorIndication:
+                print(f"SNMP error indication for {ip}: {errorIndication}")
+                continue
+
+            if errorStatus:
+                status = errorStatus.prettyPrint() if hasattr(errorStatus, "prettyPrint") else str(errorStatus)
+                if status == "tooBig" and len(chunk) > 1:
+                    # Response would not fit in one message - split the PDU and retry both halves
+                    middle = len(chunk) // 2
+                    pending[:0] = [chunk[:middle], chunk[middle:]]
+                    continue
+
+                bad_index = int(errorIndex) - 1 if errorIndex else -1
+                if 0 <= bad_index < len(chunk) and len(chunk) > 1:
+                    # Drop the offending OID and retry the rest of the PDU
+                    print(f"SNMP error status for {ip}: {status} at {chunk[bad_index]}, retrying without it")
+                    pending.insert(0, chunk[:bad_index] + chunk[bad_index + 1:])
+                    continue
+
+                print(f"SNMP error status for {ip}: {status} at {errorIndex}")
+                continue
+
+            for oid, varBind in zip(chunk, varBinds):
+                value = varBind[1]
+                if isinstance(value, (NoSuchObject, NoSuchInstance, EndOfMibView)):
+                    continue
+                results[oid] = value
+
+        return results
+
+
+    @staticmethod
+    async def get_interface_columns(ip: str, snmp_password: str, interface_indexes: List[str]) -> Dict[str, Dict[str, Any]]:
+        """
+        Fetch ifAdminStatus, ifOperStatus and ifHighSpeed for every interface with batched GETs.
+        Returns {interface_index: {"admin_status", "oper_status", "max_speed"}}; values that
+        could not be read are None.
+        """
+        columns = {
+            "admin_status": "1.3.6.1.2.1.2.2.1.7",   # ifAdminStatus
+            "oper_status": "1.3.6.1.2.1.2.2.1.8",    # ifOperStatus
+            "max_speed": "1.3.6.1.2.1.31.1.1.1.15",  # ifHighSpeed (in Mbps)
+        }
+        oids = [f"{column_oid}.{index}" for index in interface_indexes for column_oid in columns.values()]
+        values = await ConnectionService.get_many(ip, snmp_password, oids)
+
+        # Status codes: 1=up, 2=down, 3=testing
+        status_map = {1: "up", 2: "down", 3: "testing"}
+        interface_columns = {}
+        for index in interface_indexes:
+            row = {}
+            for name, column_oid in columns.items():
+                raw = values.get(f"{column_oid}.{index}")
+                try:
+                    if raw is None:
+                        row[name] = None
+                    elif name == "max_speed":
+                        row[name] = int(raw)
+                    else:
+                        row[name] = status_map.get(int(raw), "unknown")
+                except (ValueError, TypeError) as e:
+                    print(f"Error converting {name} for {ip} interface {index}: {e}")
+                    row[name] = None
+            interface_columns[index] = row
+        return interface_columns
+
+
+    @staticmethod
+    async def walk_table(ip: str, snmp_password: str, columns: Dict[str, str], max_repetitions: Optional[int] = None) -> AsyncIterator[Tuple[str, Dict[str, Any]]]:
+        """
+        Walk one or more columns of an SNMP table with GETBULK.
+        Every column is followed from its last returned OID until it leaves its own subtree,
+        and all still-active columns are requested together in each PDU. max-repetitions is
+        halved when the agent answers tooBig, and re-sized from the observed varbind size
+        after each response. A timeout is retried once with half the repetitions, but only
+        if the agent has already answered; an unreachable device fails after one timeout.
+        Yields (row_index, {column_name: value}) in index order as soon as every column has
+        moved past that row. Columns missing for a row are simply absent from its dict.
+        """
+        repetitions = max_repetitions or ConnectionService.snmp_bulk_max_repetitions
+        next_oid = dict(columns)
+        last_index: Dict[str, Tuple[int, ...]] = {}
+        active = list(columns)
+        pending_rows: Dict[Tuple[int, ...], Dict[str, Any]] = {}
+        answered = False
+        timeout_retried = False
+
+        def index_key(index: str) -> Tuple[int, ...]:
+            return tuple(int(part) for part in index.split(".") if part.isdigit())
+
+        while active:
+            engine, auth, transport = await SnmpEnginePool.target(ip, snmp_password)
             errorIndication, errorStatus, errorIndex, varBinds = await bulk_cmd(
-                ConnectionService.get_snmp_engine(ip),
-                CommunityData(snmp_password, mpModel=1, securityName=f"area-{ip}"),
-                await UdpTransportTarget.create((ip, 161)),
-                ContextData(),
-                0, 10,  # Reduced max-repetitions to avoid walking too far
-                ObjectType(ObjectIdentity("1.3.6.1.2.1.2.2.1.2"))  # ifDescr OID
+                engine,
+                auth,
+                transport,
+                ConnectionService.snmp_context,
+                0, repetitions,
+                *[ObjectType(ObjectIdentity(next_oid[name])) for name in active]
             )
 
             if errorIndication:
-                print(f"SNMP error indication for {ip}: {errorIndication}")
-                return None
-            
+                timed_out = "timeout" in str(errorIndication).lower()
+                if timed_out and answered and not timeout_retried and repetitions > 1:
+                    # The agent is up, so a large response is the likely cause of the drop - retry smaller once
+                    repetitions = max(1, repetitions // 2)
+                    timeout_retried = True
+                    continue
+                print(f"SNMP error indication during table walk for {ip}: {errorIndication}")
+                break
+
             if errorStatus:
-                print(f'SNMP error status for {ip}: {errorStatus.prettyPrint()} at {errorIndex}')
-                return None
+                status = errorStatus.prettyPrint() if hasattr(errorStatus, "prettyPrint") else str(errorStatus)
+                if status == "tooBig" and repetitions > 1:
+                    repetitions = max(1, repetitions // 2)
+                    continue
+                print(f"SNMP error status during table walk for {ip}: {status} at {errorIndex}")
+                break
+
+            answered = True
+            timeout_retried = False
 
+            if not varBinds:
+                break
+
+            # GETBULK responses interleave the requested columns: r1c1, r1c2, ..., r2c1, r2c2, ...
+            finished = set()
+            varbind_bytes = 0
+            for position, varBind in enumerate(varBinds):
+                name = active[position % len(active)]
+                if name in finished:
+                    continue
+
+                oid, value = varBind
+                oid_str = str(oid)
+                base_oid = columns[name]
+                if isinstance(value, EndOfMibView) or not oid_str.startswith(base_oid + "."):
+                    finished.add(name)
+                    continue
+
+                index = oid_str[len(base_oid) + 1:]
+                key = index_key(index)
+                if name in last_index and key <= last_index[name]:
+                    # Agent returned a non-increasing OID - stop instead of looping forever
+                    print(f"Non-increasing OID {oid_str} from {ip}, stopping column {name}")
+                    finished.add(name)
+                    continue
+
+                last_index[name] = key
+                next_oid[name] = oid_str
+                pending_rows.setdefault(key, {"_index": index})[name] = value
+                varbind_bytes += len(oid_str) + len(value.prettyPrint() if hasattr(value, "prettyPrint") else str(value)) + 8
+
+            active = [name for name in active if name not in finished]
+
+            # A row is complete once every active column has moved past it
+            if active:
+                horizon = min(last_index.get(name, ()) for name in active)
+                ready = sorted(key for key in pending_rows if key <= horizon)
+            else:
+                ready = sorted(pending_rows)
+            for key in ready:
+                row = pending_rows.pop(key)
+                yield row.pop("_index"), row
+
+            # Re-size max-repetitions so the next response fills the budget without going over
+            if active and varbind_bytes:
+                average_varbind = max(1, varbind_bytes // len(varBinds))
+                repetitions = ConnectionService.snmp_bulk_response_budget // (average_varbind * len(active))
+                repetitions = max(1, min(repetitions, ConnectionService.snmp_bulk_repetitions_limit))
+
+        # Flush whatever is left (e.g. after an error part-way through the walk)
+        for key in sorted(pending_rows):
+            row = pending_rows.pop(key)
+            yield row.pop("_index"), row
+
+
+    @staticmethod
+    async def get_interfaces_indexes(ip: str, snmp_password: Optional[str]) -> Optional[Dict[str, str]]:
+        if snmp_password is None:
+            print(f"No SNMP password provided for device {ip}")
+            return None
+        
+        try:
             interface_indexes = {}
-            base_oid = "1.3.6.1.2.1.2.2.1.2"  # ifDescr base OID
             
             # List of interface types to skip (null, loopback, etc.)
             skip_patterns = ['null', 'loopback', 'lo']
             
-            for varBind in varBinds:
-                oid, name = varBind
-                oid_str = str(oid)
-                
-                # Only process if this OID is within the ifDescr table
-                # Stop if we've walked into a different table
-                if not oid_str.startswith(base_oid):
-                    print(f"Stopping bulk walk - reached end of ifDescr table at OID: {oid_str}")
-                    break
-                
-                # Extract the interface index from OID (last octet)
-                interface_index = oid_str.split('.')[-1]
-                interface_name = str(name).strip()
+            # Walk the whole ifDescr column (1.3.6.1.2.1.2.2.1.2), however many rows it has
+            async for interface_index, row in ConnectionService.walk_table(ip, snmp_password, {"ifDescr": "1.3.6.1.2.1.2.2.1.2"}):
+                if "ifDescr" not in row:
+                    continue
+
+                interface_name = str(row["ifDescr"]).strip()
                 
                 # Filter out invalid interface names:
                 # - Must be non-empty
@@ -119,84 +321,81 @@ class ConnectionService:
 
             return interface_indexes if interface_indexes else None  # Return a dictionary of interface names and their indexes
         except Exception as e:
-            print(f"Exception during SNMP BULK for {ip}: {e}")
+            print(f"Exception during SNMP table walk for {ip}: {e}")
             return None
     
 
     @staticmethod
-    async def get_max_speed(ip: str, snmp_password: str, interface_index: str) -> Optional[int]:
+    async def get_counter_snapshot(ip: str, snmp_password: str, include_errors: bool = False) -> Optional[Dict[str, Dict[str, int]]]:
+        """
+        Read the octet counters of every interface in a single GETBULK walk.
+        Walks ifHCInOctets/ifHCOutOctets (plus ifIn/OutErrors and ifIn/OutDiscards when
+        include_errors is set) and returns {interface_index: {column: value}}.
+        """
+        columns = {
+            "in_octets": "1.3.6.1.2.1.31.1.1.1.6",    # ifHCInOctets
+            "out_octets": "1.3.6.1.2.1.31.1.1.1.10",  # ifHCOutOctets
+        }
+        if include_errors:
+            columns.update({
+                "in_discards": "1.3.6.1.2.1.2.2.1.13",   # ifInDiscards
+                "in_errors": "1.3.6.1.2.1.2.2.1.14",     # ifInErrors
+                "out_discards": "1.3.6.1.2.1.2.2.1.19",  # ifOutDiscards
+                "out_errors": "1.3.6.1.2.1.2.2.1.20",    # ifOutErrors
+            })
+
         try:
-            max_speed_oid = f'1.3.6.1.2.1.31.1.1.1.15.{interface_index}'  # ifHighSpeed (in Mbps)
-            max_speed = await ConnectionService.get_snmp(ip, snmp_password, max_speed_oid)
-            if max_speed is None:
-                return None
-            return int(max_speed)
-        except (ValueError, TypeError) as e:
-            print(f"Error converting max_speed to int for {ip}: {e}")
+            snapshot = {}
+            async for interface_index, row in ConnectionService.walk_table(ip, snmp_password, columns):
+                counters = {}
+                for name, value in row.items():
+                    try:
+                        counters[name] = int(value)
+                    except (ValueError, TypeError):
+                        continue
+                snapshot[interface_index] = counters
+            return snapshot if snapshot else None
+        except Exception as e:
+            print(f"Exception during counter snapshot for {ip}: {e}")
             return None
 
 
     @staticmethod
-    async def get_device_byte_counters(ip: str, snmp_password: str, interface_index: str) -> Optional[Tuple[int, int]]:
+    async def get_hostname(ip: str, snmp_password: str) -> Optional[str]:
+        """Fetch device hostname using SNMP sysName OID (1.3.6.1.2.1.1.5.0)"""
         try:
-            bytes_received_oid = f'1.3.6.1.2.1.31.1.1.1.6.{interface_index}'  # ifHCInOctets
-            bytes_sent_oid = f'1.3.6.1.2.1.31.1.1.1.10.{interface_index}'  # ifHCOutOctets
-
-            bytes_received_raw = await ConnectionService.get_snmp(ip, snmp_password, bytes_received_oid)
-            bytes_sent_raw = await ConnectionService.get_snmp(ip, snmp_password, bytes_sent_oid)
-            
-            if bytes_received_raw is None or bytes_sent_raw is None:
-                print(f"Failed to get byte counters for {ip}")
+            hostname = await ConnectionService.get_snmp(ip, snmp_password, "1.3.6.1.2.1.1.5.0")  # sysName
+            if hostname is None:
                 return None
-            
-            bytes_received = int(bytes_received_raw)
-            bytes_sent = int(bytes_sent_raw)
-            
-            return bytes_received, bytes_sent
-        except (ValueError, TypeError) as e:
-            print(f"Error converting byte counters to int for {ip}: {e}")
+            return str(hostname)
+        except Exception as e:
+            print(f"Error getting hostname for {ip}: {e}")
             return None
 
 
     @staticmethod
-    async def get_mbps(ip: str, snmp_password: str, interface_index: str) -> Optional[Tuple[float, float]]:
+    async def get_config_last_changed(ip: str, snmp_password: str) -> Optional[str]:
+        """Fetch CISCO-CONFIG-MAN-MIB ccmHistoryRunningLastChanged (1.3.6.1.4.1.9.9.43.1.1.1.0) as a change marker"""
         try:
-            counters1 = await ConnectionService.get_device_byte_counters(ip, snmp_password, interface_index)
-            if counters1 is None:
+            last_changed = await ConnectionService.get_snmp(ip, snmp_password, "1.3.6.1.4.1.9.9.43.1.1.1.0")  # ccmHistoryRunningLastChanged
+            # Agents without the MIB answer noSuchObject instead of an error
+            if last_changed is None or isinstance(last_changed, (NoSuchObject, NoSuchInstance, EndOfMibView)):
                 return None
-            
-            bytes_received1, bytes_sent1 = counters1
-
-            await asyncio.sleep(1)  # Wait for 1 second to get the difference in bytes
-
-            counters2 = await ConnectionService.get_device_byte_counters(ip, snmp_password, interface_index)
-            if counters2 is None:
-                return None
-            
-            bytes_received2, bytes_sent2 = counters2
-
-            bytes_received = bytes_received2 - bytes_received1
-            bytes_sent = bytes_sent2 - bytes_sent1
-            
-            megabits_received_per_second = (bytes_received * 8) / (1_000_000 * 1)  # multiplied by 8 to convert to bits 
-            megabits_sent_per_second = (bytes_sent * 8) / (1_000_000 * 1)  # multiplied by 8 to convert to bits
-    
-            return megabits_received_per_second, megabits_sent_per_second
-        except Exception as e:
-            print(f"Error calculating Mbps for {ip}: {e}")
+            return f"snmp:{int(last_changed)}"
+        except (ValueError, TypeError):
             return None
 
 
     @staticmethod
-    async def get_hostname(ip: str, snmp_password: str) -> Optional[str]:
-        """Fetch device hostname using SNMP sysName OID (1.3.6.1.2.1.1.5.0)"""
+    async def get_sys_uptime(ip: str, snmp_password: str) -> Optional[int]:
+        """Fetch sysUpTime (1.3.6.1.2.1.1.3.0) in hundredths of a second"""
         try:
-            hostname = await ConnectionService.get_snmp(ip, snmp_password, "1.3.6.1.2.1.1.5.0")  # sysName
-            if hostname is None:
+            uptime = await ConnectionService.get_snmp(ip, snmp_password, "1.3.6.1.2.1.1.3.0")  # sysUpTime
+            if uptime is None:
                 return None
-            return str(hostname)
-        except Exception as e:
-            print(f"Error getting hostname for {ip}: {e}")
+            return int(uptime)
+        except (ValueError, TypeError) as e:
+            print(f"Error converting sysUpTime for {ip}: {e}")
             return None
 
 
@@ -276,41 +475,19 @@ class ConnectionService:
     async def get_interface_index_to_ip_mapping(ip: str, snmp_password: str) -> Optional[Dict[str, str]]:
         """Map interface indexes to their IP addresses using IP-MIB table"""
         try:
-            # Query ipAdEntIfIndex (1.3.6.1.2.1.4.20.1.2) which maps IPs to interface indexes
+            # Walk ipAdEntIfIndex (1.3.6.1.2.1.4.20.1.2) which maps IPs to interface indexes
             # OID format: 1.3.6.1.2.1.4.20.1.2.a.b.c.d where a.b.c.d is the IP, value is the interface index
-            errorIndication, errorStatus, errorIndex, varBinds = await bulk_cmd(
-                ConnectionService.get_snmp_engine(ip),
-                CommunityData(snmp_password, mpModel=1, securityName=f"area-{ip}"),
-                await UdpTransportTarget.create((ip, 161)),
-                ContextData(),
-                0, 25,
-                ObjectType(ObjectIdentity("1.3.6.1.2.1.4.20.1.2"))  # ipAdEntIfIndex
-            )
-
-            if errorIndication:
-                print(f"SNMP error indication for IP-MIB for {ip}: {errorIndication}")
-                return None
-            
-            if errorStatus:
-                print(f'SNMP error status for IP-MIB for {ip}: {errorStatus.prettyPrint()} at {errorIndex}')
-                return None
-
             index_to_ip = {}
             
-            for varBind in varBinds:
-                oid, if_index = varBind
-                oid_str = str(oid)
-                
-                # Only process IPs in the ipAdEntIfIndex table
-                # OID: 1.3.6.1.2.1.4.20.1.2.x.x.x.x (where x.x.x.x is the IP)
-                if not oid_str.startswith("1.3.6.1.2.1.4.20.1.2"):
-                    break  # Stop when we exit the IP-MIB table
-                
-                # Extract IP address from OID (last 4 octets)
-                oid_parts = oid_str.split('.')
-                if len(oid_parts) >= 11:  # 1.3.6.1.2.1.4.20.1.2 = 9 parts + 4 IP octets = 13 minimum
-                    ip_address = '.'.join(oid_parts[-4:])
-                    interface_index = str(if_index)
+            async for row_index, row in ConnectionService.walk_table(ip, snmp_password, {"ipAdEntIfIndex": "1.3.6.1.2.1.4.20.1.2"}):
+                if "ipAdEntIfIndex" not in row:
+                    continue
+
+                # The row index is the IP address itself (4 octets)
+                index_parts = row_index.split('.')
+                if len(index_parts) == 4:
+                    ip_address = row_index
+                    interface_index = str(row["ipAdEntIfIndex"])
                     
                     # Only store if we got a valid interface index (should be numeric)
                     if interface_index.isdigit():
@@ -327,33 +504,13 @@ class ConnectionService:
     async def get_interface_ips(ip: str, snmp_password: str) -> Optional[Dict[str, str]]:
         """Fetch interface IP addresses using SNMP IP-MIB table"""
         try:
-            # Query IP address table (1.3.6.1.2.1.4.20.1.1) - ipAdEntAddr
-            errorIndication, errorStatus, errorIndex, varBinds = await bulk_cmd(
-                ConnectionService.get_snmp_engine(ip),
-                CommunityData(snmp_password, mpModel=1, securityName=f"area-{ip}"),
-                await UdpTransportTarget.create((ip, 161)),
-                ContextData(),
-                0, 25,
-                ObjectType(ObjectIdentity("1.3.6.1.2.1.4.20.1.1"))  # ipAdEntAddr
-            )
-
-            if errorIndication:
-                print(f"SNMP error indication for {ip}: {errorIndication}")
-                return None
-            
-            if errorStatus:
-                print(f'SNMP error status for {ip}: {errorStatus.prettyPrint()} at {errorIndex}')
-                return None
-
+            # Walk the IP address table (1.3.6.1.2.1.4.20.1.1) - ipAdEntAddr
             interface_ips = {}
-            for varBind in varBinds:
-                oid, value = varBind
+            async for row_index, row in ConnectionService.walk_table(ip, snmp_password, {"ipAdEntAddr": "1.3.6.1.2.1.4.20.1.1"}):
                 # OID format: 1.3.6.1.2.1.4.20.1.1.a.b.c.d where a.b.c.d is the IP address
-                # Extract IP from OID, not from the value (which can be garbled)
-                oid_parts = str(oid).split('.')
-                if len(oid_parts) >= 11:  # 1.3.6.1.2.1.4.20.1.1.a.b.c.d = 11 parts
-                    ip_address = '.'.join(oid_parts[-4:])
-                    interface_ips[ip_address] = ip_address
+                # Take the IP from the row index, not from the value (which can be garbled)
+                if len(row_index.split('.')) == 4:
+                    interface_ips[row_index] = row_index
 
             return interface_ips if interface_ips else None
         except Exception as e:
@@ -361,40 +518,6 @@ class ConnectionService:
             return None
 
 
-    @staticmethod
-    async def get_interface_status(ip: str, snmp_password: str, interface_index: str) -> Optional[str]:
-        """Fetch interface operational status using SNMP ifOperStatus OID (1.3.6.1.2.1.2.2.1.8.{index})"""
-        try:
-            status_raw = await ConnectionService.get_snmp(ip, snmp_password, f"1.3.6.1.2.1.2.2.1.8.{interface_index}")  # ifOperStatus
-            if status_raw is None:
-                return None
-            status_code = int(status_raw)
-            # Status codes: 1=up, 2=down, 3=testing
-            status_map = {1: "up", 2: "down", 3: "testing"}
-            return status_map.get(status_code, "unknown")
-        except Exception as e:
-            print(f"Error getting interface status for {ip}: {e}")
-            return None
-
-
-    @staticmethod
-    async def get_interface_admin_status(ip: str, snmp_password: str, interface_index: str) -> Optional[str]:
-        """Fetch interface administrative status using SNMP ifAdminStatus OID (1.3.6.1.2.1.2.2.1.7.{index})"""
-        try:
-            status_raw = await ConnectionService.get_snmp(ip, snmp_password, f"1.3.6.1.2.1.2.2.1.7.{interface_index}")  # ifAdminStatus
-            if status_raw is None:
-                return None
-            status_code = int(status_raw)
-            # Status codes: 1=up, 2=down, 3=testing
-            status_map = {1: "up", 2: "down", 3: "testing"}
-            return status_map.get(status_code, "unknown")
-        except Exception as e:
-            print(f"Error getting interface admin status for {ip}: {e}")
-            return None
-
-
-#""""""""""""""""""""""""""""""""""""""""""""""""""""""""""""""""""""""""""CLI METHODES""""""""""""""""""""""""""""""""""""""""""""""""""""""""""""""""""""""""""""""""""""""""""""
-
     @staticmethod
     def connect(device_cred: dict) -> Optional[Any]:
         
@@ -429,13 +552,43 @@ class ConnectionService:
         except Exception as e:
             print(f"Failed to connect to device {device_cred.get('ip', 'unknown')}: {str(e)}")
             return None
+
+
+    @staticmethod
+    async def run_cli(func: Callable[..., Any], *args: Any) -> Any:
+        """
+        Run a blocking Netmiko call (connect, send_command, ...) on the CLI thread pool
+        so the event loop keeps serving API requests while a device is being polled.
+        """
+        return await run_in_cli_executor(func, *args)
+
+
+    @staticmethod
+    async def connect_async(device_cred: dict) -> Optional[Any]:
+        return await ConnectionService.run_cli(ConnectionService.connect, device_cred)
+
+
+    @staticmethod
+    async def disconnect_async(net_connect: Any) -> None:
+        try:
+            await ConnectionService.run_cli(net_connect.disconnect)
+        except Exception:
+            pass
         
         
+    @staticmethod
+    def junos_command(command: str) -> str:
+        """Request structured output from Junos when JUNOS_DISPLAY_JSON is enabled."""
+        if settings.junos_display_json:
+            return f"{command} | display json"
+        return command
+
+
     @staticmethod
     def get_cisco_mbps_output(net_connect: Any, device_type: str) -> Optional[str]:
         try:
             if device_type in ["cisco_ios", "cisco_xr"]:
-                all_interfaces_output = net_connect.send_command("show interfaces")
+                all_interfaces_output = CommandPlanner.send(net_connect, "show interfaces")
                 return all_interfaces_output
             return None
         except Exception as e:
@@ -447,7 +600,7 @@ class ConnectionService:
     def get_juniper_mbps_output(net_connect: Any, device_type: str) -> Optional[str]:
         try:
             if device_type == "juniper_junos":
-                all_interfaces_output = net_connect.send_command("show interfaces extensive")
+                all_interfaces_output = CommandPlanner.send(net_connect, ConnectionService.junos_command("show interfaces extensive"))
                 return all_interfaces_output
             return None
         except Exception as e:
@@ -459,8 +612,7 @@ class ConnectionService:
     def get_cisco_outputs_cli(net_connect: Any, device_type: str) -> Optional[Tuple[str, str, str, str, str, str, datetime]]:
         try:
             if device_type == "cisco_ios":
-                # Enter enable mode
-                net_connect.enable()
+                # Enable mode is entered once when the session is created (see SessionPool)
 
                 # Get command outputs
                 hostname_output = net_connect.send_command("show running-config | include hostname")
@@ -478,7 +630,7 @@ class ConnectionService:
                 mac_output = net_connect.send_command(f"show interfaces {interface_0} | include address")
                 
                 # Get detailed output for ALL interfaces (for bandwidth extraction)
-                all_interfaces_output = net_connect.send_command("show interfaces")
+                all_interfaces_output = CommandPlanner.send(net_connect, "show interfaces")
                 
                 raw_date = datetime.now()
                 last_updated = raw_date.strftime("%d-%m-%Y %H:%M:%S")
@@ -506,7 +658,7 @@ class ConnectionService:
                 mac_output = net_connect.send_command(f"show interfaces {interface_0} | include address")
                 
                 # Get detailed output for ALL interfaces (for bandwidth extraction)
-                all_interfaces_output = net_connect.send_command("show interfaces")
+                all_interfaces_output = CommandPlanner.send(net_connect, "show interfaces")
                 
                 raw_date = datetime.now()
                 last_updated = raw_date.strftime("%d-%m-%Y %H:%M:%S")
@@ -523,29 +675,31 @@ class ConnectionService:
     def get_juniper_outputs_cli(net_connect: Any, device_type: str) -> Optional[Tuple[str, str, str, str, str, datetime]]:
         try:
             if device_type == "juniper_junos":
-                
-                # Enter CLI mode
-                net_connect.send_command("cli")
+                # CLI mode and pagination are set up once when the session is created (see SessionPool)
 
-                # Disable pagination
-                net_connect.send_command("set cli screen-length 0")
-                
                 # Get command outputs
                 hostname_output = net_connect.send_command("show configuration system host-name")
-                ip_output = net_connect.send_command("show interfaces terse")
-
-                lines = ip_output.splitlines()[1:2]
-                if not lines:
-                    print(f"No interface data found for {device_type}")
-                    return None
-                    
-                interface_output = re.match(r"(\S+)\s+", lines[0])
-                interface_0 = interface_output.group(1) if interface_output else "Not found"
+                ip_output = net_connect.send_command(ConnectionService.junos_command("show interfaces terse"))
+
+                if settings.junos_display_json:
+                    physical_interfaces = ExtractionService.junos_physical_interfaces(ExtractionService.load_junos_json(ip_output))
+                    if not physical_interfaces:
+                        print(f"No interface data found for {device_type}")
+                        return None
+                    interface_0 = ExtractionService.junos_value(physical_interfaces[0], "name", "Not found")
+                else:
+                    lines = ip_output.splitlines()[1:2]
+                    if not lines:
+                        print(f"No interface data found for {device_type}")
+                        return None
+                        
+                    interface_output = re.match(r"(\S+)\s+", lines[0])
+                    interface_0 = interface_output.group(1) if interface_output else "Not found"
 
                 mac_output = net_connect.send_command(f"show interfaces {interface_0} | match Hardware")
                 
                 # Get detailed output for ALL interfaces (for bandwidth extraction)
-                all_interfaces_output = net_connect.send_command("show interfaces extensive")
+                all_interfaces_output = CommandPlanner.send(net_connect, ConnectionService.junos_command("show interfaces extensive"))
                 
                 raw_date = datetime.now()
                 last_updated = raw_date.strftime("%d-%m-%Y %H:%M:%S")
@@ -557,13 +711,42 @@ class ConnectionService:
 
 
     @staticmethod
-    def get_cisco_config(net_connect: Any, device_type: str) -> Optional[str]:
+    def get_config_marker(net_connect: Any, device_type: str) -> Optional[str]:
+        """
+        Fetch a small marker that moves whenever the configuration changes, so the full
+        configuration is only transferred when it may have changed.
+        Returns None when the device gives no usable marker.
+        """
+        try:
+            if device_type == "cisco_ios":
+                # "! Last configuration change at ..." or "! No configuration change since last restart"
+                output = net_connect.send_command("show running-config | include configuration change")
+            elif device_type == "cisco_xr":
+                # Latest commit ID; XR prefixes every output with a timestamp line
+                output = net_connect.send_command("show configuration commit list 1")
+                output = "\n".join(line for line in normalize_config(output).splitlines() if line[:1].isdigit())
+            elif device_type == "juniper_junos":
+                # Head of the commit history: "0   2026-10-12 10:00:00 UTC by admin via cli"
+                output = net_connect.send_command("show system commit")
+                output = next((line for line in output.splitlines() if line.strip().startswith("0 ")), "")
+            else:
+                return None
+
+            output = output.strip()
+            return f"cli:{output}" if output else None
+        except Exception as e:
+            print(f"Error getting configuration change marker for {device_type}: {e}")
+            return None
+
+
+    @staticmethod
+    def get_cisco_config(net_connect: Any, device_type: str, max_age: Optional[float] = None) -> Optional[str]:
         """
         Fetch the full running configuration from a Cisco device.
         """
         try:
             if device_type in ["cisco_ios", "cisco_xr"]:
-                config_output = net_connect.send_command("show running-config")
+                config_output = CommandPlanner.send(net_connect, "show running-config", max_age)
                 return config_output
             return None
         except Exception as e:
@@ -572,13 +755,13 @@ class ConnectionService:
 
 
     @staticmethod
-    def get_juniper_config(net_connect: Any, device_type: str) -> Optional[str]:
+    def get_juniper_config(net_connect: Any, device_type: str, max_age: Optional[float] = None) -> Optional[str]:
         """
         Fetch the full configuration from a Juniper device.
         """
         try:
             if device_type == "juniper_junos":
-                config_output = net_connect.send_command("show configuration")
+                config_output = CommandPlanner.send(net_connect, "show configuration", max_age)
                 return config_output
             return None
         except Exception as e:
@@ -3,13 +3,21 @@ from src.repositories.postgres.credentials import CredentialsRepo
 from src.repositories.postgres.config import ConfigRepo
 from src.services.connection import ConnectionService
 from src.services.extraction import ExtractionService
+from src.services.rates import RateService
+from src.services.poller import FleetPoller
+from src.services.sessions import SessionPool
+from src.services.parse_cache import ParseCache
+from src.services.commands import CommandPlanner
+from src.services.config_markers import ConfigMarkers
 from src.services.credentials import CredentialsService
-from src.services.white_list import WhiteListService
+from src.services.white_list_matcher import WhiteListMatcher
 from src.config.settings import settings
 from typing import Optional, Dict, List, Any
 import asyncio
 from src.utils.web_socket import broadcast_alert
-import re
+from src.utils.config_diff import normalize_config, config_fingerprint
+from src.utils.executors import run_parse
+from src.utils.snmp import SnmpEnginePool
 from datetime import datetime
 
 
@@ -55,13 +63,24 @@ class DeviceService:
             if index_to_ip_mapping is None:
                 index_to_ip_mapping = {}
 
+            # Fetch status and speed columns for all interfaces in batched GET PDUs
+            interface_columns = await ConnectionService.get_interface_columns(ip, snmp_password, list(interface_indexes.values()))
+
+            # Rates since the previous poll of this device - one counter walk, no sleeping.
+            # The very first poll of a device only seeds the rate engine.
+            device_mbps = await RateService.sample_device(ip, snmp_password)
+            if device_mbps is None:
+                device_mbps = {}
+
             # Build interface data using SNMP - only use valid interface names from get_interfaces_indexes
             interface_data = []
             
             for interface_name, interface_index in interface_indexes.items():
+                columns = interface_columns.get(interface_index, {})
+
                 # Get interface admin and operational status
-                admin_status = await ConnectionService.get_interface_admin_status(ip, snmp_password, interface_index)
-                oper_status = await ConnectionService.get_interface_status(ip, snmp_password, interface_index)
+                admin_status = columns.get("admin_status")
+                oper_status = columns.get("oper_status")
                 
                 if admin_status is None:
                     admin_status = "unknown"
@@ -71,14 +90,14 @@ class DeviceService:
                 # Get IP address from the mapping
                 ip_address = index_to_ip_mapping.get(interface_index, "Unassigned")
 
-                # Fetch max speed
-                max_speed = await ConnectionService.get_max_speed(ip, snmp_password, interface_index)
+                # Max speed from the batched columns
+                max_speed = columns.get("max_speed")
                 max_speed = max_speed if max_speed is not None else "Not available"
 
-                # Fetch Mbps
-                mbps_data = await ConnectionService.get_mbps(ip, snmp_password, interface_index)
+                # Mbps from the device-wide counter snapshots
+                mbps_data = device_mbps.get(interface_index)
                 if mbps_data:
-                    mbps_received, mbps_sent = mbps_data
+                    mbps_received, mbps_sent = mbps_data["mbps_received"], mbps_data["mbps_sent"]
                 else:
                     mbps_received = "Not available"
                     mbps_sent = "Not available"
@@ -173,21 +192,35 @@ class DeviceService:
 
 
     @staticmethod
-    async def get_config_history(ip: str) -> List[Dict[str, Any]]:
+    async def get_config_history_page(ip: str, limit: int = 50, before_id: Optional[int] = None) -> Dict[str, Any]:
         """
-        Get the configuration history for a device by IP address.
-        Converts IP to MAC address and retrieves history from repository.
+        Get one page of configuration history metadata (no configuration texts) for a device by IP address.
         """
         try:
             mac_address = await CredentialsRepo.get_mac_from_ip(ip)
             if not mac_address:
-                return []
+                return {"items": [], "next_before_id": None}
             
-            history = await ConfigRepo.get_config_history(mac_address)
-            return history
+            return await ConfigRepo.get_history_page(mac_address, limit, before_id)
         except Exception as e:
-            print(f"Error getting config history for IP {ip}: {e}")
-            return []
+            print(f"Error getting config history page for IP {ip}: {e}")
+            return {"items": [], "next_before_id": None}
+
+
+    @staticmethod
+    async def get_config_version(ip: str, archive_id: int) -> Optional[Dict[str, Any]]:
+        """
+        Get the full text of one archived configuration for a device by IP address.
+        """
+        try:
+            mac_address = await CredentialsRepo.get_mac_from_ip(ip)
+            if not mac_address:
+                return None
+            
+            return await ConfigRepo.get_config_version(mac_address, archive_id)
+        except Exception as e:
+            print(f"Error getting config version {archive_id} for IP {ip}: {e}")
+            return None
 
 
     @staticmethod
@@ -213,35 +246,60 @@ class DeviceService:
         
 
     @staticmethod
-    async def normalize_config(config: str) -> str:
+    async def save_cli_info(ip: str, mac_address: str, hostname: str, interface_data: list, info_unchanged: bool, bandwidth_unchanged: bool, last_updated: str, raw_date: Any, device_type: str, info_neighbors: Optional[list] = None) -> None:
         """
-        Remove non-meaningful lines (timestamps, build info, etc.)
-        so configs can be compared meaningfully.
+        Save a CLI refresh. When the device info outputs did not change since the last poll, only the
+        timestamps are refreshed (plus the interface list if bandwidth changed) instead of rewriting
+        and archiving the whole record.
         """
-        normalized_lines = []
+        try:
+            if info_unchanged:
+                device_id = await DevicesRepo.mark_active(mac_address, last_updated, raw_date)
+                if device_id is not None:
+                    if bandwidth_unchanged or await DevicesRepo.update_interfaces(device_id, interface_data, last_updated, raw_date):
+                        return
 
-        for line in config.splitlines():
-            line = line.strip()
+            await DevicesRepo.save_info(mac_address, hostname, interface_data, last_updated, raw_date, device_type, info_neighbors)
+        except Exception:
+            # Make the next poll write everything again
+            ParseCache.forget(ip)
+            raise
 
-            # Skip empty lines
-            if not line:
-                continue
 
-            # Skip timestamp lines (IOS XR example)
-            if re.match(r"^[A-Z][a-z]{2}\s[A-Z][a-z]{2}\s+\d+\s\d{2}:\d{2}:\d{2}", line):
-                continue
+    @staticmethod
+    def get_cache_stats() -> Dict[str, Any]:
+        return {
+            "parse": ParseCache.stats(),
+            "commands": CommandPlanner.stats(),
+            "ssh_sessions": SessionPool.stats(),
+            "config_markers": ConfigMarkers.stats(),
+            "snmp_engines": SnmpEnginePool.stats(),
+        }
 
-            # Skip known noisy lines
-            if line.startswith("Building configuration"):
-                continue
-            if line.startswith("!! IOS XR Configuration"):
-                continue
-            if line.startswith("!! Last configuration change"):
-                continue
 
-            normalized_lines.append(line)
+    @staticmethod
+    async def normalize_config(config: str) -> str:
+        """
+        Remove non-meaningful lines (timestamps, build info, etc.)
+        so configs can be compared meaningfully.
+        """
+        return normalize_config(config)
+
 
-        return "\n".join(normalized_lines)    
+    @staticmethod
+    async def save_config_if_changed(mac_address: str, config_output: str) -> bool:
+        """
+        Save a captured configuration unless its normalized content matches the stored one.
+        Only the stored fingerprint is read, so an unchanged configuration costs no large read
+        and no archive write. Returns True when a new version was saved.
+        """
+        config_hash = await run_parse(config_fingerprint, config_output)
+        if config_hash == await ConfigRepo.get_config_hash(mac_address):
+            return False
+
+        # Save configuration to database (will automatically archive old config if exists).
+        # The hash is checked again under the row lock, a concurrent capture may have saved it first
+        return await ConfigRepo.save_config(mac_address, config_output, datetime.now(), config_hash)
 
 
     @staticmethod
@@ -264,87 +322,130 @@ class DeviceService:
 
 
     @staticmethod
-    async def capture_and_save_config(cred: dict) -> None:
+    async def capture_and_save_config(cred: dict) -> Optional[bool]:
         """
         Helper method to capture device configuration via CLI and save it to the database.
         Handles both SNMP and CLI polling scenarios.
+        Returns True when a new version was saved, False when the configuration is unchanged
+        and None when it could not be captured.
         """
         try:
             ip = cred.get("ip")
             mac_address = cred.get("mac_address")
             device_type = cred.get("device_type")
             
-            # Try to connect via CLI to fetch configuration
-            connection = ConnectionService.connect(cred)
-            if not connection:
-                print(f"Could not establish connection to fetch config for device {ip}")
-                return
-            
             config_output = None
-            
-            try:
+            marker = None
+
+            # Cisco devices with SNMP report when the running config last changed without an SSH session
+            if settings.config_change_markers and "cisco" in device_type and cred.get("snmp_password"):
+                marker = await ConnectionService.get_config_last_changed(ip, cred["snmp_password"])
+                # Without an SNMP marker the CLI marker below decides, so each capture is counted once
+                if marker is not None and not ConfigMarkers.changed(ip, marker):
+                    return False
+
+            # Fetch the configuration over the device's pooled CLI session
+            async with SessionPool.session(cred) as connection:
+                if not connection:
+                    print(f"Could not establish connection to fetch config for device {ip}")
+                    ConfigMarkers.forget(ip)
+                    return None
+
+                # Otherwise ask the device for its change marker before pulling the whole configuration
+                if settings.config_change_markers and marker is None:
+                    marker = await ConnectionService.run_cli(ConnectionService.get_config_marker, connection, device_type)
+                    if not ConfigMarkers.changed(ip, marker):
+                        return False
+
+                # After a marker change the configuration is read fresh, not from the output cache
+                max_age = 0 if marker is not None else None
                 if "cisco" in device_type:
-                    config_output = ConnectionService.get_cisco_config(connection, device_type)
+                    config_output = await ConnectionService.run_cli(ConnectionService.get_cisco_config, connection, device_type, max_age)
                 elif "juniper" in device_type:
-                    config_output = ConnectionService.get_juniper_config(connection, device_type)
+                    config_output = await ConnectionService.run_cli(ConnectionService.get_juniper_config, connection, device_type, max_age)
                 else:
                     print(f"Unsupported device type for config capture: {device_type}")
-            finally:
-                # Always close connection
-                try:
-                    connection.disconnect()
-                except Exception:
-                    pass
+                    return None
+
+                if config_output is None:
+                    SessionPool.mark_broken(ip)
             
             if config_output:
-                normalized_new_config = await DeviceService.normalize_config(config_output)
-                normalized_old_config = await DeviceService.normalize_config((await DeviceService.get_current_config(ip))["configuration"])
-
                 # Only save if the configuration changed
-                if normalized_new_config != normalized_old_config:
-                    # Save configuration to database (will automatically archive old config if exists)
-                    await ConfigRepo.save_config(mac_address, config_output, datetime.now())
+                saved = await DeviceService.save_config_if_changed(mac_address, config_output)
+                if saved:
                     print(f"Successfully captured and saved configuration for device {mac_address} ({ip})")
+                ConfigMarkers.remember(ip, marker)
+                return saved
             else:
                 print(f"No configuration data retrieved for device {ip}")
+                return None
                 
         except Exception as e:
             print(f"Error capturing configuration: {e}")
+            return None
+
+
+    # mac -> id of the last stored diff the whitelist alerts were evaluated for
+    alerted_diffs: Dict[str, int] = {}
+    started_at: datetime = datetime.now()
+
+
+    @staticmethod
+    async def poll_config(cred: dict) -> Dict[str, Any]:
+        """
+        Capture one device's configuration and alert on whitelist words in its latest change.
+        Each stored diff is alerted once, also when the CLI refresh saved the change first.
+        """
+        mac_address = cred.get("mac_address")
+        if await DeviceService.capture_and_save_config(cred) is None:
+            return {"success": False, "reason": f"Could not capture configuration of device {cred.get('ip')}"}
+
+        # Stored at save time, no need to reload and diff both configurations
+        differences = await ConfigRepo.get_latest_diff(mac_address)
+        if differences and differences["id"] != DeviceService.alerted_diffs.get(mac_address):
+            first_check = mac_address not in DeviceService.alerted_diffs
+            DeviceService.alerted_diffs[mac_address] = differences["id"]
+            # After a restart only changes saved since startup are alerted
+            if not first_check or differences["queried_at"] >= DeviceService.started_at:
+                # One pass over the changed lines for all whitelist words (cached matcher)
+                changed_words = await WhiteListMatcher.changed_words(differences["added_lines"], differences["deleted_lines"])
+                for word in changed_words:
+                    await broadcast_alert({
+                        "Alert": f"{word} changed!"
+                    })
+                    print("---------------------Alerted frontend---------------------")
+        return {"success": True}
 
 
     @staticmethod
     async def poll_config_loop():
+        """
+        Capture configurations of the whole fleet every `conf_interval` seconds.
+        Device captures are spread evenly (with jitter) across the interval and run concurrently,
+        at most `conf_max_concurrency` at a time.
+        """
         while True:
             try:
                 creds = await CredentialsService.get_all_cred()
-                for cred in creds:
-                    await DeviceService.capture_and_save_config(cred)
-                    differences = await DeviceService.get_config_differences(cred.get("ip"))
-                    if differences:
-                        white_list = await WhiteListService.get_white_list() 
-
-                        for dict in white_list:
-                            header = re.escape(dict["words"])
-                            pattern = re.compile(rf"^\s*{header}\b", re.MULTILINE)
-                            added_lines = differences["added_lines"]
-                            deleted_lines = differences["deleted_lines"]
-                            
-                            for line in added_lines:
-                                added = pattern.search(line or "")
-
-                            for line in deleted_lines:
-                                deleted = pattern.search(line or "")
-
-                            if added or deleted:
-                                await broadcast_alert({
-                                    "Alert": f"{dict['words']} changed!"
-                                })
-                                print("---------------------Alerted frontend---------------------")
-
-                    await asyncio.sleep(settings.conf_interval)
+                if creds:
+                    DeviceService.forget_removed_devices({cred.get("ip") for cred in creds})
+                creds = [cred for cred in creds if cred.get("device_type") and cred.get("ip") and cred.get("mac_address")]
+
+                report = await FleetPoller.run_cycle(
+                    creds,
+                    DeviceService.poll_config,
+                    "Config poll",
+                    spread=settings.conf_interval,
+                    max_concurrency=settings.conf_max_concurrency
+                )
+                if report["duration"] > settings.conf_interval + settings.poll_device_timeout:
+                    print(f"Config poll cycle took {report['duration']}s for a {settings.conf_interval}s interval")
 
+                await asyncio.sleep(max(0, settings.conf_interval - report["duration"]))
             except Exception as e:        
                 print(f"error in poll_config_loop: {e}")
+                await asyncio.sleep(settings.conf_interval)
 
 
     @staticmethod
@@ -352,27 +453,49 @@ class DeviceService:
         """
         Periodically refresh all devices via SNMP at the specified interval.
         Only devices with complete SNMP credentials are updated.
+        Devices are refreshed concurrently by the FleetPoller; the next cycle starts
+        `device_interval` seconds after the previous one started.
         """
         while True:
             try:
                 creds = await CredentialsService.get_all_cred()
-                for cred in creds:
-                    if cred.get("device_type") and cred.get("ip") and cred.get("username") and cred.get("password") and cred.get("snmp_password") is not None:
-                        try:
-                            await DeviceService.update_device_info_snmp(cred)
-                        except Exception as e:
-                            print(f"Error updating device {cred.get('ip')} via SNMP: {e}")
-                            continue
-                await asyncio.sleep(device_interval)
+                creds = [
+                    cred for cred in creds
+                    if cred.get("device_type") and cred.get("ip") and cred.get("username") and cred.get("password") and cred.get("snmp_password") is not None
+                ]
+
+                report = await FleetPoller.run_cycle(creds, DeviceService.update_device_info_snmp, "SNMP refresh")
+                if report["duration"] > device_interval:
+                    print(f"SNMP refresh cycle took {report['duration']}s, longer than the {device_interval}s interval")
+
+                await asyncio.sleep(max(0, device_interval - report["duration"]))
             except Exception as e:
                 print(f"cred Error in periodic refresh SNMP: {e}")
+                await asyncio.sleep(device_interval)
+
+
+    @staticmethod
+    def forget_removed_devices(active_ips: set) -> None:
+        """Drop per-device in-memory state of devices that no longer have credentials."""
+        for ip in RateService.ips() - active_ips:
+            RateService.forget(ip)
+        for ip in set(ConfigMarkers.markers) - active_ips:
+            ConfigMarkers.forget(ip)
+        for ip in CommandPlanner.ips() - active_ips:
+            CommandPlanner.forget(ip)
 
 
     @staticmethod
     async def update_mbps_snmp() -> None:
         try:
             ip_and_snmp_list = await CredentialsService.get_all_ip_and_snmp()
+            if ip_and_snmp_list:
+                DeviceService.forget_removed_devices({entry.get("ip") for entry in ip_and_snmp_list})
             interface_dicts_list = await DevicesRepo.get_interface_data()
+
+            # Walk indexes and counters once per device per cycle, not once per interface
+            indexes_by_ip: Dict[str, Optional[Dict[str, str]]] = {}
+            mbps_by_ip: Dict[str, Optional[Dict[str, Any]]] = {}
             
             for interface_dict in interface_dicts_list:
                 interfaces_data_list = interface_dict.get("interface", [])
@@ -382,7 +505,10 @@ class DeviceService:
                         if ip_and_snmp_dict.get("snmp_password") is None:
                             continue
                         if interface_data.get("ip_address") == ip_and_snmp_dict.get("ip"):
-                            interface_indexes = await ConnectionService.get_interfaces_indexes(ip_and_snmp_dict["ip"], ip_and_snmp_dict["snmp_password"])
+                            device_ip = ip_and_snmp_dict["ip"]
+                            if device_ip not in indexes_by_ip:
+                                indexes_by_ip[device_ip] = await ConnectionService.get_interfaces_indexes(device_ip, ip_and_snmp_dict["snmp_password"])
+                            interface_indexes = indexes_by_ip[device_ip]
                             if interface_indexes is None:
                                 print(f"Skipping Mbps update for {interface_data.get('ip_address')} due to missing interface indexes")
                                 continue
@@ -392,9 +518,11 @@ class DeviceService:
                                 print(f"Interface {interface_name} not found in SNMP indexes")
                                 continue
                             
-                            mbps_data = await ConnectionService.get_mbps(ip_and_snmp_dict["ip"], ip_and_snmp_dict["snmp_password"], interface_indexes[interface_name])
+                            if device_ip not in mbps_by_ip:
+                                mbps_by_ip[device_ip] = await RateService.sample_device(device_ip, ip_and_snmp_dict["snmp_password"])
+                            mbps_data = (mbps_by_ip[device_ip] or {}).get(interface_indexes[interface_name])
                             if mbps_data:
-                                interface_data["mbps_received"], interface_data["mbps_sent"] = mbps_data
+                                interface_data["mbps_received"], interface_data["mbps_sent"] = mbps_data["mbps_received"], mbps_data["mbps_sent"]
                             else:
                                 print(f"Failed to get Mbps data for {interface_data.get('ip_address')}")
                                 continue
@@ -407,6 +535,8 @@ class DeviceService:
 
     @staticmethod
     async def update_mbps_loop_snmp(mbps_interval: float) -> None:
+        # Rates are computed between consecutive polls, so they need a real interval between them
+        mbps_interval = max(settings.mbps_min_interval, mbps_interval)
         while True:
             await DeviceService.update_mbps_snmp()
             await asyncio.sleep(mbps_interval)
@@ -421,18 +551,18 @@ class DeviceService:
         """
         Periodically refresh all devices via CLI at the specified interval.
         Only devices with complete CLI credentials are updated.
+        SSH work runs on the CLI thread pool, so devices are polled concurrently.
         """
         while True:
             try:
                 creds = await CredentialsService.get_all_cred()
-                for cred in creds:
-                    if cred.get("device_type") and cred.get("ip") and cred.get("username") and cred.get("password") is not None:
-                        try:
-                            await DeviceService.update_device_info_cli(cred)
-                        except Exception as e:
-                            print(f"Error updating device {cred.get('ip')} via CLI: {e}")
-                            continue
-                await asyncio.sleep(device_interval)
+                creds = [
+                    cred for cred in creds
+                    if cred.get("device_type") and cred.get("ip") and cred.get("username") and cred.get("password") is not None
+                ]
+
+                report = await FleetPoller.run_cycle(creds, DeviceService.update_device_info_cli, "CLI refresh")
+                await asyncio.sleep(max(0, device_interval - report["duration"]))
             except Exception as e:
                 print(f"Error in periodic refresh CLI: {e}")
                 await asyncio.sleep(device_interval)
@@ -446,110 +576,119 @@ class DeviceService:
             device_type = cred.get("device_type")  # Extract device type from credentials
             ip = cred.get("ip")
             
-            connection = ConnectionService.connect(cred)
-            
-            if not connection:
+            outputs = None
+            config_output = None
+
+            # Collect everything over the device's pooled CLI session, then release it before parsing
+            async with SessionPool.session(cred) as connection:
+                if not connection:
                     await DevicesRepo.flag_device_inactive(mac_address)
                     return {"success": False, "reason": f"Failed to connect to device {ip}"}
+
+                if "cisco" in cred["device_type"]:
+                    outputs = await ConnectionService.run_cli(ConnectionService.get_cisco_outputs_cli, connection, cred["device_type"])
+                    if outputs is not None:
+                        # Capture configuration on the same session
+                        config_output = await ConnectionService.run_cli(ConnectionService.get_cisco_config, connection, cred["device_type"])
+                elif "juniper" in cred["device_type"]:
+                    outputs = await ConnectionService.run_cli(ConnectionService.get_juniper_outputs_cli, connection, cred["device_type"])
+                    if outputs is not None:
+                        # Capture configuration on the same session
+                        config_output = await ConnectionService.run_cli(ConnectionService.get_juniper_config, connection, cred["device_type"])
+                else:
+                    return {"success": True}
+
+                if outputs is None:
+                    SessionPool.mark_broken(ip)
+
             if "cisco" in cred["device_type"]:
-                outputs = ConnectionService.get_cisco_outputs_cli(connection, cred["device_type"])
-                
                 if outputs is None:
-                    connection.disconnect()
                     print(f"Failed to get CLI outputs from device {ip}")
                     return {"success": False, "reason": f"Failed to get CLI outputs from device {ip}"}
                     
                 hostname_output, ip_output, mac_output, info_neighbors_output, all_interfaces_output, last_updated, raw_date = outputs
                 
-                # Capture configuration before disconnecting
-                config_output = ConnectionService.get_cisco_config(connection, cred["device_type"])
-                
-                # Close the connection
-                connection.disconnect()
-                
-                extraction_result = ExtractionService.extract_cisco_cli(
+                # Device info is parsed without "show interfaces" (whose counters change every poll),
+                # so byte-identical outputs reuse the previous extraction
+                extraction_result, info_unchanged = await ParseCache.parse(
+                    ip,
+                    "device_info",
+                    ExtractionService.extract_cisco_cli,
                     cred["device_type"], 
                     hostname_output, 
                     ip_output, 
                     mac_output, 
-                    info_neighbors_output,
-                    all_interfaces_output
+                    info_neighbors_output
                 )
                 if extraction_result is None:
                     print(f"Failed to extract CLI data from device {ip}")
                     return {"success": False, "reason": f"Failed to extract CLI data from device {ip}"}
                     
                 extracted_mac, hostname, interface_data, info_neighbors = extraction_result
+
+                # Attach bandwidth per interface from "show interfaces"
+                bandwidth_data, bandwidth_unchanged = await ParseCache.parse(ip, "info:bandwidth", ExtractionService.extract_bandwidth, all_interfaces_output)
+                interface_data = [
+                    dict(interface_info, bandwidth=dict(bandwidth_data.get(interface_info["interface"], {})))
+                    for interface_info in interface_data
+                ]
                 
                 # Save to database with device_type
-                await DevicesRepo.save_info(extracted_mac, hostname, interface_data, last_updated, raw_date, device_type, info_neighbors)
+                await DeviceService.save_cli_info(ip, extracted_mac, hostname, interface_data, info_unchanged, bandwidth_unchanged, last_updated, raw_date, device_type, info_neighbors)
                 
                 # Save configuration to database
                 if config_output:
                     try:
-                        normalized_new_config = await DeviceService.normalize_config(config_output)
-                        normalized_old_config = await DeviceService.normalize_config((await DeviceService.get_current_config(ip))["configuration"])
-
                         # Only save if the configuration changed
-                        if normalized_new_config != normalized_old_config:
-
-                            await ConfigRepo.save_config(extracted_mac, config_output, datetime.now())
+                        if await DeviceService.save_config_if_changed(extracted_mac, config_output):
                             print(f"Successfully saved configuration for device {extracted_mac}")
                     except Exception as e:
                         print(f"Warning: Failed to save configuration for device {extracted_mac}: {e}")
                 
 
             elif "juniper" in cred["device_type"]:
-                outputs = ConnectionService.get_juniper_outputs_cli(connection, cred["device_type"])
-
                 if outputs is None:
-                    connection.disconnect()
                     print(f"Failed to get CLI outputs from device {ip}")
                     return {"success": False, "reason": f"Failed to get outputs from device {ip}"}
                     
                 hostname_output, ip_output, mac_output, all_interfaces_output, last_updated, raw_date = outputs
                 
-                # Capture configuration before disconnecting
-                config_output = ConnectionService.get_juniper_config(connection, cred["device_type"])
-                
-                # Close the connection
-                connection.disconnect()
-                
-                extraction_result = ExtractionService.extract_juniper_cli(
+                # Device info is parsed without "show interfaces extensive" (whose counters change every poll),
+                # so byte-identical outputs reuse the previous extraction
+                extraction_result, info_unchanged = await ParseCache.parse(
+                    ip,
+                    "device_info",
+                    ExtractionService.extract_juniper_json if settings.junos_display_json else ExtractionService.extract_juniper_cli,
                     cred["device_type"], 
                     hostname_output, 
                     ip_output, 
-                    mac_output,
-                    all_interfaces_output
+                    mac_output
                 )
                 if extraction_result is None:
                     print(f"Failed to extract CLI data from device {ip}")
                     return {"success": False, "reason": f"Failed to extract CLI data from device {ip}"}
                     
                 extracted_mac, hostname, interface_data = extraction_result
+
+                # Attach bandwidth of the physical interface to each logical unit
+                bandwidth_parser = ExtractionService.extract_bandwidth_juniper_json if settings.junos_display_json else ExtractionService.extract_bandwidth_juniper
+                bandwidth_data, bandwidth_unchanged = await ParseCache.parse(ip, "info:bandwidth", bandwidth_parser, all_interfaces_output)
+                interface_data = [
+                    dict(interface_info, bandwidth=dict(bandwidth_data.get(interface_info["Interface"].split('.')[0], {})))
+                    for interface_info in interface_data
+                ]
                 
                 # Save to database with device_type
-                await DevicesRepo.save_info(extracted_mac, hostname, interface_data, last_updated, raw_date, device_type)
+                await DeviceService.save_cli_info(ip, extracted_mac, hostname, interface_data, info_unchanged, bandwidth_unchanged, last_updated, raw_date, device_type)
                 
                 # Save configuration to database
                 if config_output:
                     try:
-                        normalized_new_config = await DeviceService.normalize_config(config_output)
-                        normalized_old_config = await DeviceService.normalize_config((await DeviceService.get_current_config(ip))["configuration"])
-
                         # Only save if the configuration changed
-                        if normalized_new_config != normalized_old_config:
-                            
-                            await ConfigRepo.save_config(extracted_mac, config_output, datetime.now())
+                        if await DeviceService.save_config_if_changed(extracted_mac, config_output):
                             print(f"Successfully saved configuration for device {extracted_mac}")
                     except Exception as e:
                         print(f"Warning: Failed to save configuration for device {extracted_mac}: {e}")
-
-            if connection:
-                try:
-                    connection.disconnect()
-                except Exception:
-                    pass
             
             return {"success": True}
             
@@ -565,14 +704,19 @@ class DeviceService:
         """
         Continuously update bandwidth metrics for all CLI-managed devices at the specified interval.
         """
+        mbps_interval = max(settings.mbps_min_interval, mbps_interval)
         while True:
             try:
                 creds = await CredentialsService.get_all_cred()
+                creds = [
+                    cred for cred in creds
+                    if cred.get("device_type") and cred.get("ip") and cred.get("username") and cred.get("password") is not None
+                ]
                 for cred in creds:
-                    if cred.get("device_type") and cred.get("ip") and cred.get("username") and cred.get("password") is not None:
-                        snmp_password = cred.pop("snmp_password", None)
-                        await DeviceService.update_mbps_cli(cred)
-                await asyncio.sleep(mbps_interval)
+                    cred.pop("snmp_password", None)
+
+                report = await FleetPoller.run_cycle(creds, DeviceService.update_mbps_cli, "CLI Mbps")
+                await asyncio.sleep(max(0, mbps_interval - report["duration"]))
             except Exception as e:
                 print(f"Error in update Mbps loop CLI: {e}")
                 await asyncio.sleep(mbps_interval)
@@ -581,49 +725,42 @@ class DeviceService:
     @staticmethod
     async def update_mbps_cli(cred: dict) -> Optional[bool]:
         try:
-            connection = ConnectionService.connect(cred)
-            if not connection:
-                return None
-            
-            if "cisco" in cred["device_type"]:
-                all_interfaces_output = ConnectionService.get_cisco_mbps_output(connection, cred["device_type"])
-
-                # Close the connection
-                connection.disconnect()
-                
-                if all_interfaces_output is None:
-                    print(f"Failed to get Mbps output from device {cred.get('ip', 'unknown')}")
+            async with SessionPool.session(cred) as connection:
+                if not connection:
                     return None
-                    
-                all_interfaces_data = ExtractionService.extract_bandwidth(all_interfaces_output)
-                if all_interfaces_data is None or not all_interfaces_data:
-                    print(f"Failed to extract bandwidth data from device {cred.get('ip', 'unknown')}")
+
+                if "cisco" in cred["device_type"]:
+                    all_interfaces_output = await ConnectionService.run_cli(ConnectionService.get_cisco_mbps_output, connection, cred["device_type"])
+                elif "juniper" in cred["device_type"]:
+                    all_interfaces_output = await ConnectionService.run_cli(ConnectionService.get_juniper_mbps_output, connection, cred["device_type"])
+                else:
+                    print(f"Unsupported device type: {cred.get('device_type', 'unknown')}")
                     return None
-                    
-                await DevicesRepo.update_bandwidth_cli(cred['ip'], all_interfaces_data)
-                return True
-            
-            elif "juniper" in cred["device_type"]:
-                all_interfaces_output = ConnectionService.get_juniper_mbps_output(connection, cred["device_type"])
 
-                # Close the connection
-                connection.disconnect()
-                
                 if all_interfaces_output is None:
+                    SessionPool.mark_broken(cred.get("ip"))
                     print(f"Failed to get Mbps output from device {cred.get('ip', 'unknown')}")
                     return None
-                    
-                all_interfaces_data = ExtractionService.extract_bandwidth_juniper(all_interfaces_output)
-                if all_interfaces_data is None or not all_interfaces_data:
-                    print(f"Failed to extract bandwidth data from device {cred.get('ip', 'unknown')}")
-                    return None
-                    
-                DevicesRepo.update_bandwidth_cli(cred['ip'], all_interfaces_data)
-                return True
-            
+
+            if "cisco" in cred["device_type"]:
+                parser = ExtractionService.extract_bandwidth
+            elif settings.junos_display_json:
+                parser = ExtractionService.extract_bandwidth_juniper_json
             else:
-                print(f"Unsupported device type: {cred.get('device_type', 'unknown')}")
+                parser = ExtractionService.extract_bandwidth_juniper
+            all_interfaces_data, unchanged = await ParseCache.parse(cred["ip"], "mbps:bandwidth", parser, all_interfaces_output)
+
+            if all_interfaces_data is None or not all_interfaces_data:
+                print(f"Failed to extract bandwidth data from device {cred.get('ip', 'unknown')}")
                 return None
+
+            # Same output as the last poll (e.g. served from the command cache): already stored
+            if unchanged:
+                return True
+                
+            if await DevicesRepo.update_bandwidth_cli(cred['ip'], all_interfaces_data) is None:
+                ParseCache.forget(cred["ip"], "mbps:bandwidth")
+            return True
                 
         except Exception as e:
             print(f"Error updating Mbps CLI for {cred.get('ip', 'unknown')}: {e}")
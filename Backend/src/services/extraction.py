@@ -1,7 +1,40 @@
 from typing import Optional, Tuple, List, Dict, Any
+import json
 import re
 
 
+# Header line of a Cisco "show interfaces" section, e.g. "GigabitEthernet0/0 is up, line protocol is up"
+CISCO_SECTION_HEADER = re.compile(r"^([A-Za-z][A-Za-z0-9\/\-\.]*)\s+is\s+(?:up|down|administratively down)", re.MULTILINE)
+
+# Header line of a Juniper "show interfaces extensive" section, e.g. "Physical interface: ge-0/0/0, Enabled, Physical link is Up"
+JUNIPER_SECTION_HEADER = re.compile(r"^Physical interface:\s+([A-Za-z0-9\/\-\.]+)", re.MULTILINE)
+
+# Every per-interface field in one alternation, so a section is scanned once instead of once per field.
+# The leading lookahead lets the engine skip positions that cannot start any field.
+# Cisco error counters share one branch: "counter" names the field and "counter_value" holds the number.
+CISCO_BANDWIDTH_FIELDS = re.compile(
+    r"(?=[BMtr5\d])(?:"
+    r"BW\s+(?P<bw>\d+)\s+Kbit"
+    r"|MTU\s+(?P<mtu>\d+)"
+    r"|txload\s+(?P<txload>\d+)/255"
+    r"|rxload\s+(?P<rxload>\d+)/255"
+    r"|5 minute (?:input rate (?P<input_rate>\d+)|output rate (?P<output_rate>\d+)) bits/sec"
+    r"|(?<!\d)(?P<counter_value>\d+)\s+(?P<counter>CRC|input errors|output errors)"
+    r")"
+)
+
+# Juniper fields all start with a literal, which re.search skips to quickly; one precompiled
+# pattern per field measured faster here than a combined alternation.
+JUNIPER_BANDWIDTH_FIELDS = {
+    "speed": re.compile(r"Speed:\s+(\d+)mbps"),
+    "mtu": re.compile(r"MTU:\s+(\d+)"),
+    "input_rate": re.compile(r"Input\s+rate\s*:\s*(\d+)\s+bps"),
+    "output_rate": re.compile(r"Output\s+rate\s*:\s*(\d+)\s+bps"),
+    "input_errors": re.compile(r"Input\s+errors:\s+(\d+)"),
+    "output_errors": re.compile(r"Output\s+errors:\s+(\d+)"),
+}
+
+
 class ExtractionService:
 
     @staticmethod 
@@ -148,6 +181,50 @@ class ExtractionService:
 
 #""""""""""""""""""""""""""""""""""""""""""""""""""CLI METHODES""""""""""""""""""""""""""""""""""""""""""""""""""""""""""""""""""""""""""""""""""""""""""""""""""""""""""""""""""""""""""""""""""""""""""""""""""""""""""""""""""""""""""""""""""
 
+    @staticmethod
+    def scan_fields(pattern: re.Pattern, text: str, field_count: int) -> Dict[str, str]:
+        """
+        Single pass over text with a multi-field pattern.
+        Returns field -> value of the first match of each field, the same result as one re.search per field.
+        """
+        found = {}
+        for match in pattern.finditer(text):
+            field = match.lastgroup
+            value = match.group(field)
+            if field == "counter":
+                field, value = value, match.group("counter_value")
+            if field not in found:
+                found[field] = value
+                if len(found) == field_count:
+                    break
+        return found
+
+
+    @staticmethod
+    def index_cisco_sections(all_interfaces_output: str) -> Dict[str, Tuple[int, int]]:
+        """
+        Split Cisco "show interfaces" output into per-interface sections in a single pass.
+        Returns interface name -> (start, end) offsets into the output; a section runs from its
+        header line up to the next header. Build it once per output and pass it to get_cisco_section.
+        """
+        sections = {}
+        headers = list(CISCO_SECTION_HEADER.finditer(all_interfaces_output))
+        for i, header in enumerate(headers):
+            end = headers[i + 1].start() if i + 1 < len(headers) else len(all_interfaces_output)
+            sections.setdefault(header.group(1), (header.start(), end))
+        return sections
+
+
+    @staticmethod
+    def get_cisco_section(all_interfaces_output: str, interface_name: str, sections: Optional[Dict[str, Tuple[int, int]]] = None) -> Optional[str]:
+        if sections is None:
+            sections = ExtractionService.index_cisco_sections(all_interfaces_output)
+        bounds = sections.get(interface_name)
+        if bounds is None:
+            return None
+        return all_interfaces_output[bounds[0]:bounds[1]]
+
+
     @staticmethod    
     def extract_bandwidth(all_interfaces_output: Optional[str] = None) -> Dict[str, Dict[str, Any]]:
         bandwidth_data = {}
@@ -155,23 +232,9 @@ class ExtractionService:
             if all_interfaces_output is None:
                 return {}
                 
-            # Split by interface sections
-            interface_sections = re.split(r'\n(?=[A-Za-z].*is\s+(up|down|administratively down))', all_interfaces_output)
-            
-            for i, section in enumerate(interface_sections):
-                if i == 0:
-                    continue  # Skip header
-                
-                # Extract interface name
-                interface_match = re.match(r'([A-Za-z0-9\/\-\.]+)\s+is', section)
-                if not interface_match:
-                    continue
-                
-                interface_name = interface_match.group(1)
-                
-                # Call function 1 to extract bandwidth for this interface
-                bandwidth_info = ExtractionService.extract_bandwidth_per_interface_cisco(section)
-                
+            # Walk the interface sections found by the indexer
+            for interface_name, (start, end) in ExtractionService.index_cisco_sections(all_interfaces_output).items():
+                bandwidth_info = ExtractionService.extract_bandwidth_per_interface_cisco(all_interfaces_output[start:end])
                 bandwidth_data[interface_name] = bandwidth_info
             
             return bandwidth_data
@@ -198,22 +261,20 @@ class ExtractionService:
         - input_errors: Total input errors
         """
         try:
+            fields = ExtractionService.scan_fields(CISCO_BANDWIDTH_FIELDS, interface_output, 9)
+
             # Extract BW (Maximum Bandwidth configured)
             # Format: BW 1000000 Kbit (Max: 1000000 Kbit) or BW 1000000 Kbit/sec
-            bandwidth_match = re.search(r"BW\s+(\d+)\s+Kbit", interface_output)
-            bandwidth_max_mbps = int(bandwidth_match.group(1)) / 1000 if bandwidth_match else None
+            bandwidth_max_mbps = int(fields["bw"]) / 1000 if "bw" in fields else None
             
             
             # Extract MTU (Maximum Transmission Unit)
-            mtu_match = re.search(r"MTU\s+(\d+)", interface_output)
-            mtu = mtu_match.group(1) if mtu_match else None
+            mtu = fields.get("mtu")
             
             # Extract current load percentages (txload = transmit load, rxload = receive load)
             # Scale: 0-255, where 255 = 100% utilization
-            txload_match = re.search(r"txload\s+(\d+)/255", interface_output)
-            txload_current = int(txload_match.group(1)) if txload_match else 0
-            rxload_match = re.search(r"rxload\s+(\d+)/255", interface_output)
-            rxload_current = int(rxload_match.group(1)) if rxload_match else 0
+            txload_current = int(fields.get("txload", 0))
+            rxload_current = int(fields.get("rxload", 0))
             
             # Calculate percentage from 0-255 scale
             txload_percent = round((txload_current / 255) * 100, 2)
@@ -221,22 +282,13 @@ class ExtractionService:
             
             # Extract 5-minute input/output rates
             # Format: "5 minute input rate 5000 bits/sec, 4 packets/sec"
-            input_rate_match = re.search(r"5 minute input rate (\d+) bits/sec", interface_output)
-            input_rate_kbps = int(input_rate_match.group(1)) / 1000 if input_rate_match else 0
-            output_rate_match = re.search(r"5 minute output rate (\d+) bits/sec", interface_output)
-            output_rate_kbps = int(output_rate_match.group(1)) / 1000 if output_rate_match else 0
-            
-            # Extract CRC errors
-            crc_match = re.search(r"(\d+)\s+CRC", interface_output)
-            crc_errors = int(crc_match.group(1)) if crc_match else 0
+            input_rate_kbps = int(fields.get("input_rate", 0)) / 1000
+            output_rate_kbps = int(fields.get("output_rate", 0)) / 1000
             
-            # Extract total input errors
-            input_errors_match = re.search(r"(\d+)\s+input errors", interface_output)
-            input_errors = int(input_errors_match.group(1)) if input_errors_match else 0
-            
-            # Extract output errors
-            output_errors_match = re.search(r"(\d+)\s+output errors", interface_output)
-            output_errors = int(output_errors_match.group(1)) if output_errors_match else 0
+            # Extract CRC, total input and output errors
+            crc_errors = int(fields.get("CRC", 0))
+            input_errors = int(fields.get("input errors", 0))
+            output_errors = int(fields.get("output errors", 0))
             
             return {
                 "bandwidth_max_mbps": bandwidth_max_mbps,
@@ -256,6 +308,31 @@ class ExtractionService:
             return {}
         
 
+    @staticmethod
+    def index_juniper_sections(all_interfaces_output: str) -> Dict[str, Tuple[int, int]]:
+        """
+        Split Juniper "show interfaces extensive" output into physical-interface sections in a single pass.
+        Returns base interface name (ge-0/0/0) -> (start, end) offsets; logical units stay inside their
+        physical interface's section. Build it once per output and pass it to get_juniper_section.
+        """
+        sections = {}
+        headers = list(JUNIPER_SECTION_HEADER.finditer(all_interfaces_output))
+        for i, header in enumerate(headers):
+            end = headers[i + 1].start() if i + 1 < len(headers) else len(all_interfaces_output)
+            sections.setdefault(header.group(1), (header.start(), end))
+        return sections
+
+
+    @staticmethod
+    def get_juniper_section(all_interfaces_output: str, base_interface: str, sections: Optional[Dict[str, Tuple[int, int]]] = None) -> Optional[str]:
+        if sections is None:
+            sections = ExtractionService.index_juniper_sections(all_interfaces_output)
+        bounds = sections.get(base_interface)
+        if bounds is None:
+            return None
+        return all_interfaces_output[bounds[0]:bounds[1]]
+
+
     @staticmethod    
     def extract_bandwidth_juniper(all_interfaces_output: Optional[str] = None) -> Dict[str, Dict[str, Any]]:
         """
@@ -266,23 +343,9 @@ class ExtractionService:
             if all_interfaces_output is None:
                 return {}
                 
-            # Split by "Physical interface:" sections
-            interface_sections = re.split(r'\n(?=Physical interface:)', all_interfaces_output)
-            
-            for section in interface_sections:
-                if not section.strip():
-                    continue
-                
-                # Extract interface name from "Physical interface: ge-0/0/0, Enabled, Physical link is Up"
-                interface_match = re.search(r'Physical interface:\s+([A-Za-z0-9\/\-\.]+)', section)
-                if not interface_match:
-                    continue
-                
-                interface_name = interface_match.group(1)
-                
-                # Extract bandwidth for this interface
-                bandwidth_info = ExtractionService.extract_bandwidth_per_interface_juniper(section)
-                
+            # Walk the "Physical interface:" sections found by the indexer
+            for interface_name, (start, end) in ExtractionService.index_juniper_sections(all_interfaces_output).items():
+                bandwidth_info = ExtractionService.extract_bandwidth_per_interface_juniper(all_interfaces_output[start:end])
                 bandwidth_data[interface_name] = bandwidth_info
             
             return bandwidth_data
@@ -298,6 +361,9 @@ class ExtractionService:
         Extract Cisco device information including interface details and bandwidth per interface
         """
         try:
+            # Index the interface sections once; every interface below looks itself up in it
+            sections = ExtractionService.index_cisco_sections(all_interfaces_output) if all_interfaces_output else {}
+
             if device_type == "cisco_ios":
 
                 # Extract basic device info
@@ -333,16 +399,10 @@ class ExtractionService:
                         
                         # If we have detailed interface output, extract bandwidth info
                         if all_interfaces_output:
-                            # Find the section for this specific interface
-                            interface_section = re.search(
-                                f"{interface_name} is.*?(?=\n[A-Za-z]|$)", 
-                                all_interfaces_output, 
-                                re.DOTALL
-                            )
+                            # Look up the section for this specific interface in the section index
+                            interface_section = ExtractionService.get_cisco_section(all_interfaces_output, interface_name, sections)
                             if interface_section:
-                                bandwidth_info = ExtractionService.extract_bandwidth_per_interface_cisco(
-                                    interface_section.group(0)
-                                )
+                                bandwidth_info = ExtractionService.extract_bandwidth_per_interface_cisco(interface_section)
                                 interface_info["bandwidth"] = bandwidth_info
                         
                         interface_data.append(interface_info)
@@ -397,16 +457,10 @@ class ExtractionService:
                         
                         # If we have detailed interface output, extract bandwidth info
                         if all_interfaces_output:
-                            # Find the section for this specific interface
-                            interface_section = re.search(
-                                f"{interface_name} is.*?(?=\n[A-Za-z]|$)", 
-                                all_interfaces_output, 
-                                re.DOTALL
-                            )
+                            # Look up the section for this specific interface in the section index
+                            interface_section = ExtractionService.get_cisco_section(all_interfaces_output, interface_name, sections)
                             if interface_section:
-                                bandwidth_info = ExtractionService.extract_bandwidth_per_interface_cisco(
-                                    interface_section.group(0)
-                                )
+                                bandwidth_info = ExtractionService.extract_bandwidth_per_interface_cisco(interface_section)
                                 interface_info["bandwidth"] = bandwidth_info
                         
                         interface_data.append(interface_info)
@@ -445,32 +499,27 @@ class ExtractionService:
         - output_errors: Total output errors
         """
         try:
+            fields = {}
+            for field, pattern in JUNIPER_BANDWIDTH_FIELDS.items():
+                match = pattern.search(interface_output)
+                if match:
+                    fields[field] = match.group(1)
+
             # Extract Speed (Maximum Bandwidth)
             # Format: Speed: 1000mbps
-            speed_match = re.search(r"Speed:\s+(\d+)mbps", interface_output)
-            bandwidth_max_mbps = int(speed_match.group(1)) if speed_match else None
+            bandwidth_max_mbps = int(fields["speed"]) if "speed" in fields else None
             
             # Extract MTU (Maximum Transmission Unit)
-            mtu_match = re.search(r"MTU:\s+(\d+)", interface_output)
-            mtu = mtu_match.group(1) if mtu_match else None
+            mtu = fields.get("mtu")
             
-            # Extract input rate (bits per second)
+            # Extract input/output rate (bits per second)
             # Format: Input rate     : 5000 bps (4 pps)
-            input_rate_match = re.search(r"Input\s+rate\s*:\s*(\d+)\s+bps", interface_output)
-            input_rate_bps = int(input_rate_match.group(1)) if input_rate_match else 0
+            input_rate_bps = int(fields.get("input_rate", 0))
+            output_rate_bps = int(fields.get("output_rate", 0))
             
-            # Extract output rate (bits per second)
-            # Format: Output rate    : 5000 bps (4 pps)
-            output_rate_match = re.search(r"Output\s+rate\s*:\s*(\d+)\s+bps", interface_output)
-            output_rate_bps = int(output_rate_match.group(1)) if output_rate_match else 0
-            
-            # Extract input errors
-            input_errors_match = re.search(r"Input\s+errors:\s+(\d+)", interface_output)
-            input_errors = int(input_errors_match.group(1)) if input_errors_match else 0
-            
-            # Extract output errors
-            output_errors_match = re.search(r"Output\s+errors:\s+(\d+)", interface_output)
-            output_errors = int(output_errors_match.group(1)) if output_errors_match else 0
+            # Extract input/output errors
+            input_errors = int(fields.get("input_errors", 0))
+            output_errors = int(fields.get("output_errors", 0))
             
             # Calculate utilization percentages if bandwidth is known
             input_utilization_percent = 0
@@ -519,6 +568,9 @@ class ExtractionService:
                     hostname = "Hostname not found"     
 
                 interface_data = []
+                # Index the physical interface sections once; units of the same physical interface share its parsed bandwidth
+                sections = ExtractionService.index_juniper_sections(all_interfaces_output) if all_interfaces_output else {}
+                bandwidth_by_base = {}
                 for line in ip_output.splitlines()[1:]:
                     # Skip empty lines
                     if not line.strip():
@@ -551,20 +603,170 @@ class ExtractionService:
                             # Find the section for this specific interface
                             # Juniper format: "Physical interface: ge-0/0/0, Enabled, Physical link is Up"
                             base_interface = interface_name.split('.')[0]  # Get base interface without unit
-                            interface_section = re.search(
-                                f"Physical interface: {base_interface},.*?(?=Physical interface:|$)", 
-                                all_interfaces_output, 
-                                re.DOTALL
-                            )
-                            if interface_section:
-                                bandwidth_info = ExtractionService.extract_bandwidth_per_interface_juniper(
-                                    interface_section.group(0)
+                            if base_interface not in bandwidth_by_base:
+                                interface_section = ExtractionService.get_juniper_section(all_interfaces_output, base_interface, sections)
+                                bandwidth_by_base[base_interface] = (
+                                    ExtractionService.extract_bandwidth_per_interface_juniper(interface_section)
+                                    if interface_section else None
                                 )
-                                interface_info["bandwidth"] = bandwidth_info
+                            if bandwidth_by_base[base_interface] is not None:
+                                interface_info["bandwidth"] = dict(bandwidth_by_base[base_interface])
                         
                         interface_data.append(interface_info)
 
                 return mac_address, hostname, interface_data
         except Exception as e:
             print(f"Error in extract_juniper_cli: {e}")
-            return {"success": False, "reason": str(e)}
\ No newline at end of file
+            return {"success": False, "reason": str(e)}
+
+
+#""""""""""""""""""""""""""""""""""""""""""""""""""JUNOS JSON""""""""""""""""""""""""""""""""""""""""""""""""""""""""""""""""""""""""""""""""""""""""""""""""""""""""""""""""""""""""""""""""""""""""""""""""""""""""""""""""""""""""""""""""""""
+
+    @staticmethod
+    def load_junos_json(output: str) -> Dict[str, Any]:
+        """
+        Decode a "| display json" reply. Junos may print blank lines before the object and
+        a "{master}" style banner after it, so only the first JSON object is decoded.
+        """
+        start = output.find("{")
+        if start == -1:
+            return {}
+        document, _ = json.JSONDecoder().raw_decode(output, start)
+        return document
+
+
+    @staticmethod
+    def junos_value(node: Dict[str, Any], key: str, default: Any = None) -> Any:
+        """Junos JSON wraps every leaf as {"key": [{"data": value}]}."""
+        values = node.get(key)
+        if not values:
+            return default
+        return values[0].get("data", default)
+
+
+    @staticmethod
+    def junos_physical_interfaces(document: Dict[str, Any]) -> List[Dict[str, Any]]:
+        interfaces = []
+        for information in document.get("interface-information", []):
+            interfaces.extend(information.get("physical-interface", []))
+        return interfaces
+
+
+    @staticmethod
+    def extract_bandwidth_per_interface_juniper_json(physical: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Same fields as extract_bandwidth_per_interface_juniper, read from one
+        "physical-interface" node of "show interfaces extensive | display json"
+        """
+        value = ExtractionService.junos_value
+
+        speed_match = re.match(r"(\d+)mbps$", str(value(physical, "speed", "")))
+        bandwidth_max_mbps = int(speed_match.group(1)) if speed_match else None
+
+        mtu = value(physical, "mtu")
+        mtu = mtu if mtu and str(mtu).isdigit() else None
+
+        traffic = (physical.get("traffic-statistics") or [{}])[0]
+        input_rate_bps = int(value(traffic, "input-bps", 0))
+        output_rate_bps = int(value(traffic, "output-bps", 0))
+
+        input_errors = int(value((physical.get("input-error-list") or [{}])[0], "input-errors", 0))
+        output_errors = int(value((physical.get("output-error-list") or [{}])[0], "output-errors", 0))
+
+        input_utilization_percent = 0
+        output_utilization_percent = 0
+        if bandwidth_max_mbps and bandwidth_max_mbps > 0:
+            bandwidth_max_bps = bandwidth_max_mbps * 1_000_000
+            input_utilization_percent = round((input_rate_bps / bandwidth_max_bps) * 100, 2)
+            output_utilization_percent = round((output_rate_bps / bandwidth_max_bps) * 100, 2)
+
+        return {
+            "bandwidth_max_mbps": bandwidth_max_mbps,
+            "input_rate_bps": input_rate_bps,
+            "input_rate_kbps": round(input_rate_bps / 1000, 2),
+            "output_rate_bps": output_rate_bps,
+            "output_rate_kbps": round(output_rate_bps / 1000, 2),
+            "input_utilization_percent": input_utilization_percent,
+            "output_utilization_percent": output_utilization_percent,
+            "mtu": mtu,
+            "input_errors": input_errors,
+            "output_errors": output_errors
+        }
+
+
+    @staticmethod
+    def extract_bandwidth_juniper_json(all_interfaces_output: Optional[str] = None) -> Dict[str, Dict[str, Any]]:
+        """
+        Extract bandwidth for all Juniper interfaces from "show interfaces extensive | display json" output
+        """
+        bandwidth_data = {}
+        try:
+            if all_interfaces_output is None:
+                return {}
+
+            document = ExtractionService.load_junos_json(all_interfaces_output)
+            for physical in ExtractionService.junos_physical_interfaces(document):
+                interface_name = ExtractionService.junos_value(physical, "name")
+                if interface_name:
+                    bandwidth_data[interface_name] = ExtractionService.extract_bandwidth_per_interface_juniper_json(physical)
+
+            return bandwidth_data
+
+        except Exception as e:
+            print(f"Error extracting Juniper JSON interfaces: {e}")
+            return {}
+
+
+    @staticmethod
+    def extract_juniper_json(device_type: str, hostname_output: str, ip_output: str, mac_output: str, all_interfaces_output: Optional[str] = None) -> Optional[Tuple[str, str, List[Dict[str, Any]]]]:
+        """
+        Same result as extract_juniper_cli, with ip_output from "show interfaces terse | display json"
+        and all_interfaces_output from "show interfaces extensive | display json"
+        """
+        try:
+            if device_type == "juniper_junos":
+                value = ExtractionService.junos_value
+
+                mac_match = re.search(r"Hardware address: (\S+)", mac_output)
+                mac_address = mac_match.group(1) if mac_match else "Not found"
+
+                hostname_match = re.search(r"host-name\s+(\S+);", hostname_output)
+                hostname = hostname_match.group(1) if hostname_match else "Hostname not found"
+
+                bandwidth_data = ExtractionService.extract_bandwidth_juniper_json(all_interfaces_output) if all_interfaces_output else {}
+
+                interface_data = []
+                document = ExtractionService.load_junos_json(ip_output)
+                for physical in ExtractionService.junos_physical_interfaces(document):
+                    # One row per physical interface followed by its logical units, like the terse table
+                    for interface in [physical] + physical.get("logical-interface", []):
+                        interface_name = value(interface, "name")
+                        if not interface_name:
+                            continue
+
+                        # The terse table shows the first address of the first address family on the unit's line
+                        family = (interface.get("address-family") or [{}])[0]
+                        address = (family.get("interface-address") or [{}])[0]
+                        protocol = value(family, "address-family-name")
+                        ip_address = value(address, "ifa-local")
+                        remote_ip = value(address, "ifa-destination")
+
+                        interface_info = {
+                            "Interface": interface_name,
+                            "Status": f"{value(interface, 'admin-status')}/{value(interface, 'oper-status')}",
+                            "Protocol": protocol if protocol and ip_address else "Unassigned",
+                            "IP_Address": ip_address if ip_address else "Unassigned",
+                            "Remote IP": remote_ip,
+                            "bandwidth": {}
+                        }
+
+                        base_interface = interface_name.split('.')[0]
+                        if base_interface in bandwidth_data:
+                            interface_info["bandwidth"] = dict(bandwidth_data[base_interface])
+
+                        interface_data.append(interface_info)
+
+                return mac_address, hostname, interface_data
+        except Exception as e:
+            print(f"Error in extract_juniper_json: {e}")
+            return {"success": False, "reason": str(e)}
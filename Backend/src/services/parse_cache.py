@@ -0,0 +1,67 @@
+from src.utils.executors import run_parse
+from typing import Optional, Dict, Tuple, Any, Callable
+import hashlib
+
+
+class ParseCache:
+    """
+    Per-device, per-command cache of parsed CLI outputs keyed by a digest of the raw outputs.
+    When a device returns byte-identical outputs, the previously extracted structure is reused
+    and callers can skip the database writes that would store the same data again.
+    Cached structures are shared: treat them as read-only.
+    """
+
+    # (ip, command) -> (digest of the outputs, parsed structure)
+    entries: Dict[Tuple[str, str], Tuple[bytes, Any]] = {}
+    hits: int = 0
+    misses: int = 0
+
+
+    @staticmethod
+    def digest(*outputs: Any) -> bytes:
+        h = hashlib.blake2b(digest_size=16)
+        for output in outputs:
+            h.update(str(output).encode("utf-8", "surrogateescape"))
+            h.update(b"\0")
+        return h.digest()
+
+
+    @staticmethod
+    async def parse(ip: str, command: str, parser: Callable[..., Any], *outputs: Any) -> Tuple[Any, bool]:
+        """
+        Return (parsed, unchanged). unchanged is True when the outputs are identical to the
+        previous call for this device and command, in which case parsing is skipped.
+        """
+        key = (ip, command)
+        digest = ParseCache.digest(*outputs)
+        cached = ParseCache.entries.get(key)
+        if cached is not None and cached[0] == digest:
+            ParseCache.hits += 1
+            return cached[1], True
+
+        ParseCache.misses += 1
+        parsed = await run_parse(parser, *outputs)
+        # Failed extractions (None, {} or an error dict) are not cached
+        if parsed and not (isinstance(parsed, dict) and parsed.get("success") is False):
+            ParseCache.entries[key] = (digest, parsed)
+        else:
+            ParseCache.entries.pop(key, None)
+        return parsed, False
+
+
+    @staticmethod
+    def forget(ip: str, command: Optional[str] = None) -> None:
+        """Drop cached results (e.g. after a failed write) so the next poll writes again."""
+        for key in [key for key in ParseCache.entries if key[0] == ip and (command is None or key[1] == command)]:
+            ParseCache.entries.pop(key, None)
+
+
+    @staticmethod
+    def stats() -> Dict[str, Any]:
+        total = ParseCache.hits + ParseCache.misses
+        return {
+            "entries": len(ParseCache.entries),
+            "hits": ParseCache.hits,
+            "misses": ParseCache.misses,
+            "hit_rate": round(ParseCache.hits / total, 3) if total else 0.0,
+        }
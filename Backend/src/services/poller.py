@@ -0,0 +1,92 @@
+from src.config.settings import settings
+from typing import Optional, Dict, List, Any, Callable, Awaitable
+import asyncio
+import ipaddress
+import random
+import time
+
+
+class FleetPoller:
+    """
+    Runs one polling cycle over many devices concurrently.
+    Concurrency is bounded globally (`poll_max_concurrency`) and per subnet
+    (`poll_per_subnet_limit` devices per /`poll_subnet_prefix`), and every device
+    gets its own deadline (`poll_device_timeout`) so a slow or unreachable device
+    cannot hold up the rest of the fleet.
+    With `spread`, device starts are staggered evenly (with jitter) across that many seconds
+    instead of all starting at once.
+    """
+
+    @staticmethod
+    def subnet_key(ip: Optional[str]) -> str:
+        try:
+            return str(ipaddress.ip_network(f"{ip}/{settings.poll_subnet_prefix}", strict=False))
+        except ValueError:
+            return str(ip)
+
+
+    @staticmethod
+    def start_offsets(count: int, spread: float) -> List[float]:
+        """One start time per device: evenly spaced slots across `spread`, at a random point within each slot."""
+        if count == 0 or spread <= 0:
+            return [0.0] * count
+        slot = spread / count
+        return [index * slot + random.uniform(0, slot) for index in range(count)]
+
+
+    @staticmethod
+    async def run_cycle(creds: List[Dict[str, Any]], worker: Callable[[Dict[str, Any]], Awaitable[Any]], name: str = "poll",
+                        spread: float = 0, max_concurrency: Optional[int] = None) -> Dict[str, Any]:
+        """
+        Run `worker(cred)` for every credential as concurrent tasks and wait for all of them.
+        Returns a cycle report: device count, successes, failures, timeouts, duration and the
+        slowest device (seconds).
+        """
+        global_limit = asyncio.Semaphore(max(1, max_concurrency or settings.poll_max_concurrency))
+        subnet_limits: Dict[str, asyncio.Semaphore] = {}
+        device_times: List[float] = []
+
+        async def poll_one(cred: Dict[str, Any], start_offset: float) -> str:
+            if start_offset > 0:
+                await asyncio.sleep(start_offset)
+            ip = cred.get("ip")
+            subnet = FleetPoller.subnet_key(ip)
+            if subnet not in subnet_limits:
+                subnet_limits[subnet] = asyncio.Semaphore(max(1, settings.poll_per_subnet_limit))
+
+            # Take the subnet slot first so waiting devices don't hold global slots
+            async with subnet_limits[subnet]:
+                async with global_limit:
+                    device_started = time.monotonic()
+                    try:
+                        result = await asyncio.wait_for(worker(cred), timeout=settings.poll_device_timeout)
+                    except asyncio.TimeoutError:
+                        print(f"{name}: device {ip} exceeded its {settings.poll_device_timeout}s deadline")
+                        return "timed_out"
+                    except Exception as e:
+                        print(f"{name}: error polling device {ip}: {e}")
+                        return "failed"
+                    finally:
+                        device_times.append(time.monotonic() - device_started)
+
+            # Workers report failure either as {"success": False, ...} or as None/False
+            if result is None or result is False or (isinstance(result, dict) and result.get("success") is False):
+                return "failed"
+            return "succeeded"
+
+        started = time.monotonic()
+        offsets = FleetPoller.start_offsets(len(creds), spread)
+        outcomes = await asyncio.gather(*[poll_one(cred, offset) for cred, offset in zip(creds, offsets)])
+        duration = time.monotonic() - started
+
+        report = {
+            "devices": len(creds),
+            "succeeded": outcomes.count("succeeded"),
+            "failed": outcomes.count("failed"),
+            "timed_out": outcomes.count("timed_out"),
+            "duration": round(duration, 2),
+            "slowest_device": round(max(device_times, default=0), 2),
+        }
+        print(f"{name} cycle finished in {report['duration']}s: {report['succeeded']}/{report['devices']} succeeded, "
+              f"{report['failed']} failed, {report['timed_out']} timed out, slowest device {report['slowest_device']}s")
+        return report
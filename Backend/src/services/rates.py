@@ -0,0 +1,133 @@
+from src.services.connection import ConnectionService
+from src.utils.bandwidth import bytes_to_mbps
+from src.config.settings import settings
+from datetime import datetime
+from typing import Optional, Dict, Tuple, Any
+import time
+
+
+class RateService:
+
+    # Last counter sample per (device ip, ifIndex):
+    # {"in_octets", "out_octets", "sys_uptime", "monotonic", "sampled_at"}
+    samples: Dict[Tuple[str, str], Dict[str, Any]] = {}
+
+    COUNTER64_MODULUS = 2 ** 64
+    TIMETICKS_MODULUS = 2 ** 32
+
+
+    @staticmethod
+    def counter_delta(previous: int, current: int) -> Optional[int]:
+        """
+        Difference between two ifHC* counter readings, allowing for one 64-bit wrap.
+        A "wrap" that would mean more than half the counter space was consumed is treated
+        as a counter reset (cleared counters, line card swap) and returns None.
+        """
+        if current >= previous:
+            return current - previous
+        delta = current + RateService.COUNTER64_MODULUS - previous
+        if delta > RateService.COUNTER64_MODULUS // 2:
+            return None
+        return delta
+
+
+    @staticmethod
+    def agent_restarted(previous_uptime: Optional[int], current_uptime: Optional[int], interval: float) -> bool:
+        """
+        True when sysUpTime went backwards, i.e. the agent rebooted and its counters
+        restarted from zero. A decrease explained by the 32-bit TimeTicks wrap is not a reset.
+        """
+        if previous_uptime is None or current_uptime is None:
+            return False
+        if current_uptime >= previous_uptime:
+            return False
+        expected_ticks = previous_uptime + int(interval * 100)
+        return expected_ticks < RateService.TIMETICKS_MODULUS
+
+
+    @staticmethod
+    def update(ip: str, snapshot: Dict[str, Dict[str, int]], sys_uptime: Optional[int], now: Optional[float] = None) -> Dict[str, Dict[str, Any]]:
+        """
+        Store a new counter snapshot for a device and compute rates against the previous one.
+        Returns {interface_index: {"mbps_received", "mbps_sent", "interval", "sampled_at"}}
+        for every interface that had a usable previous sample. Interfaces seen for the
+        first time, or whose counters were reset, only seed the next computation.
+        A sample taken less than `mbps_min_interval` seconds after the stored one (e.g. a device
+        refresh right after an Mbps poll) gives no rate and keeps the stored sample.
+        """
+        now = time.monotonic() if now is None else now
+        sampled_at = datetime.now()
+        rates = {}
+
+        for interface_index, counters in snapshot.items():
+            if "in_octets" not in counters or "out_octets" not in counters:
+                continue
+
+            key = (ip, interface_index)
+            previous = RateService.samples.get(key)
+            interval = now - previous["monotonic"] if previous is not None else None
+            if interval is not None and interval < settings.mbps_min_interval:
+                # Too short a window for a meaningful rate; the next poll measures from the stored sample
+                continue
+
+            RateService.samples[key] = {
+                "in_octets": counters["in_octets"],
+                "out_octets": counters["out_octets"],
+                "sys_uptime": sys_uptime,
+                "monotonic": now,
+                "sampled_at": sampled_at,
+            }
+
+            if interval is None or interval <= 0:
+                continue
+
+            if RateService.agent_restarted(previous["sys_uptime"], sys_uptime, interval):
+                print(f"sysUpTime went backwards on {ip}, discarding previous counter sample")
+                continue
+
+            bytes_received = RateService.counter_delta(previous["in_octets"], counters["in_octets"])
+            bytes_sent = RateService.counter_delta(previous["out_octets"], counters["out_octets"])
+            if bytes_received is None or bytes_sent is None:
+                print(f"Counter reset detected on {ip} interface {interface_index}")
+                continue
+
+            rates[interface_index] = {
+                "mbps_received": bytes_to_mbps(bytes_received, interval),
+                "mbps_sent": bytes_to_mbps(bytes_sent, interval),
+                "interval": round(interval, 3),
+                "sampled_at": sampled_at,
+            }
+
+        return rates
+
+
+    @staticmethod
+    async def sample_device(ip: str, snmp_password: str) -> Optional[Dict[str, Dict[str, Any]]]:
+        """
+        Take one counter snapshot of a device (no sleeping) and return the rates since
+        the previous poll of the same device.
+        """
+        try:
+            sys_uptime = await ConnectionService.get_sys_uptime(ip, snmp_password)
+            snapshot = await ConnectionService.get_counter_snapshot(ip, snmp_password)
+            if snapshot is None:
+                # Unreachable: the old samples would only give a rate over the whole outage
+                RateService.forget(ip)
+                return None
+            return RateService.update(ip, snapshot, sys_uptime)
+        except Exception as e:
+            print(f"Error sampling counters for {ip}: {e}")
+            return None
+
+
+    @staticmethod
+    def forget(ip: str) -> None:
+        """Drop the stored samples of a device (e.g. when it is removed)."""
+        for key in [key for key in RateService.samples if key[0] == ip]:
+            RateService.samples.pop(key, None)
+
+
+    @staticmethod
+    def ips() -> set:
+        """IPs that currently have stored samples."""
+        return {key[0] for key in RateService.samples}
@@ -0,0 +1,160 @@
+from src.services.connection import ConnectionService
+from src.services.commands import CommandPlanner
+from src.config.settings import settings
+from contextlib import asynccontextmanager
+from typing import Optional, Dict, Any, AsyncIterator
+import asyncio
+import time
+
+
+class SessionPool:
+    """
+    One authenticated Netmiko session per device, shared by the info, Mbps and config loops.
+    A per-device lock serialises use of a session (Netmiko channels are not thread safe).
+    Sessions are health checked before reuse, closed after `ssh_session_idle_timeout`
+    seconds without use and recycled after `ssh_session_max_age` seconds.
+    """
+
+    # ip -> {"connection": Netmiko connection, "key": credentials tuple,
+    #        "created": monotonic time, "last_used": monotonic time, "broken": bool}
+    sessions: Dict[str, Dict[str, Any]] = {}
+    locks: Dict[str, asyncio.Lock] = {}
+    last_sweep: float = 0.0
+
+
+    @staticmethod
+    def credentials_key(cred: dict) -> tuple:
+        return (cred.get("device_type"), cred.get("username"), cred.get("password"), cred.get("secret"))
+
+
+    @staticmethod
+    @asynccontextmanager
+    async def session(cred: dict) -> AsyncIterator[Optional[Any]]:
+        """
+        Hold the device's session for the duration of the block.
+        Yields None when no connection could be established.
+        """
+        ip = cred.get("ip")
+        await SessionPool.close_idle()
+
+        lock = SessionPool.locks.setdefault(ip, asyncio.Lock())
+        async with lock:
+            connection = await SessionPool._acquire(cred)
+            try:
+                yield connection
+            except BaseException:
+                SessionPool.mark_broken(ip)
+                raise
+            finally:
+                entry = SessionPool.sessions.get(ip)
+                if entry is not None:
+                    if entry["broken"]:
+                        await SessionPool._close(ip)
+                    else:
+                        entry["last_used"] = time.monotonic()
+
+
+    @staticmethod
+    def mark_broken(ip: str) -> None:
+        """Drop the device's session when it is released (e.g. a command failed mid-way)."""
+        entry = SessionPool.sessions.get(ip)
+        if entry is not None:
+            entry["broken"] = True
+
+
+    @staticmethod
+    async def close_idle() -> None:
+        """Close sessions that are idle or too old; runs at most once a minute."""
+        now = time.monotonic()
+        if now - SessionPool.last_sweep < 60:
+            return
+        SessionPool.last_sweep = now
+
+        for ip, entry in list(SessionPool.sessions.items()):
+            lock = SessionPool.locks.get(ip)
+            if lock is not None and lock.locked():
+                continue
+            if SessionPool._expired(entry, now):
+                await SessionPool._close(ip)
+
+
+    @staticmethod
+    async def close_all() -> None:
+        for ip in list(SessionPool.sessions):
+            await SessionPool._close(ip)
+
+
+    @staticmethod
+    def stats() -> Dict[str, Any]:
+        now = time.monotonic()
+        return {
+            "sessions": len(SessionPool.sessions),
+            "oldest_age": max((now - entry["created"] for entry in SessionPool.sessions.values()), default=0),
+        }
+
+
+    @staticmethod
+    def _expired(entry: Dict[str, Any], now: float) -> bool:
+        return (now - entry["last_used"] > settings.ssh_session_idle_timeout
+                or now - entry["created"] > settings.ssh_session_max_age)
+
+
+    @staticmethod
+    async def _acquire(cred: dict) -> Optional[Any]:
+        ip = cred.get("ip")
+        entry = SessionPool.sessions.get(ip)
+
+        if entry is not None:
+            if entry["key"] != SessionPool.credentials_key(cred):
+                # Outputs captured with the old credentials may come from another device or privilege level
+                CommandPlanner.forget(ip)
+                await SessionPool._close(ip)
+            elif SessionPool._expired(entry, time.monotonic()):
+                await SessionPool._close(ip)
+            else:
+                try:
+                    alive = await ConnectionService.run_cli(entry["connection"].is_alive)
+                except Exception:
+                    alive = False
+                if alive:
+                    return entry["connection"]
+                print(f"SSH session to {ip} is no longer alive, reconnecting")
+                await SessionPool._close(ip)
+
+        connection = await ConnectionService.connect_async(cred)
+        if not connection:
+            CommandPlanner.forget(ip)
+            return None
+
+        await ConnectionService.run_cli(SessionPool._prepare, connection, cred.get("device_type"))
+        now = time.monotonic()
+        SessionPool.sessions[ip] = {
+            "connection": connection,
+            "key": SessionPool.credentials_key(cred),
+            "created": now,
+            "last_used": now,
+            "broken": False,
+        }
+        return connection
+
+
+    @staticmethod
+    def _prepare(net_connect: Any, device_type: Optional[str]) -> None:
+        """One-time session setup that used to be repeated on every poll."""
+        try:
+            if device_type == "cisco_ios":
+                # Enter enable mode
+                net_connect.enable()
+            elif device_type == "juniper_junos":
+                # Enter CLI mode and disable pagination
+                net_connect.send_command("cli")
+                net_connect.send_command("set cli screen-length 0")
+        except Exception as e:
+            print(f"Session preparation failed for {device_type}: {e}")
+
+
+    @staticmethod
+    async def _close(ip: str) -> None:
+        entry = SessionPool.sessions.pop(ip, None)
+        if entry is not None:
+            await ConnectionService.disconnect_async(entry["connection"])
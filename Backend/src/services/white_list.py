@@ -1,4 +1,5 @@
 from src.repositories.postgres.white_list import WhiteListRepo
+from src.services.white_list_matcher import WhiteListMatcher
 from typing import Optional, Dict, List, Any
 import asyncio
 
@@ -7,7 +8,10 @@ class WhiteListService:
 
     @staticmethod
     async def add_words(words: str) -> Dict[str, Any]:
-        return await WhiteListRepo.add_words(words)
+        try:
+            return await WhiteListRepo.add_words(words)
+        finally:
+            WhiteListMatcher.invalidate()
 
     @staticmethod
     async def get_white_list() -> List[Dict[str, Any]]:
@@ -15,4 +19,7 @@ class WhiteListService:
 
     @staticmethod
     async def delete_word(word: str) -> Dict[str, Any]:
-        return await WhiteListRepo.delete_word(word)
\ No newline at end of file
+        try:
+            return await WhiteListRepo.delete_word(word)
+        finally:
+            WhiteListMatcher.invalidate()
\ No newline at end of file
@@ -0,0 +1,87 @@
+from src.repositories.postgres.white_list import WhiteListRepo
+from typing import Optional, Dict, List, Any, Iterable
+import asyncio
+import re
+
+
+class WhiteListMatcher:
+    """
+    In-memory matcher for the whitelist words used by the config alerts.
+    All words are compiled into one alternation, so every diff line is scanned once instead of
+    once per word. The matcher is built on first use and rebuilt only after the whitelist is
+    changed through WhiteListService (add_words / delete_word).
+    """
+
+    words: Optional[List[str]] = None
+    # Longest words first, so the alternation reports the longest word matching a line
+    combined: Optional[re.Pattern] = None
+    # word -> its exact pattern, the same one the alerts used per word before
+    patterns: Dict[str, re.Pattern] = {}
+    # word -> other words that are a prefix of it and may match the same line
+    prefixes: Dict[str, List[str]] = {}
+    lock: asyncio.Lock = asyncio.Lock()
+    # Bumped on every change, so a load that raced with a change is not kept
+    version: int = 0
+
+
+    @staticmethod
+    def build(words: List[str]) -> None:
+        words = list(dict.fromkeys(word for word in words if word and word.strip()))
+        WhiteListMatcher.patterns = {word: re.compile(rf"^\s*{re.escape(word)}\b") for word in words}
+        WhiteListMatcher.prefixes = {
+            word: [other for other in words if other != word and word.startswith(other)]
+            for word in words
+        }
+        if words:
+            alternation = "|".join(re.escape(word) for word in sorted(words, key=len, reverse=True))
+            WhiteListMatcher.combined = re.compile(rf"^\s*({alternation})")
+        else:
+            WhiteListMatcher.combined = None
+        WhiteListMatcher.words = words
+
+
+    @staticmethod
+    async def load() -> None:
+        """Build the matcher from the database unless it is already built."""
+        if WhiteListMatcher.words is not None:
+            return
+        async with WhiteListMatcher.lock:
+            while WhiteListMatcher.words is None:
+                version = WhiteListMatcher.version
+                white_list = await WhiteListRepo.get_white_list()
+                if version == WhiteListMatcher.version:
+                    WhiteListMatcher.build([entry["words"] for entry in white_list])
+
+
+    @staticmethod
+    def invalidate() -> None:
+        WhiteListMatcher.version += 1
+        WhiteListMatcher.words = None
+
+
+    @staticmethod
+    def match_lines(lines: Iterable[str]) -> set:
+        """Whitelist words found at the start of any of the lines."""
+        combined = WhiteListMatcher.combined
+        matched = set()
+        if combined is None:
+            return matched
+
+        for line in lines:
+            m = combined.match(line or "")
+            if m is None:
+                continue
+            # Every word matching this line is the longest candidate or one of its prefixes
+            candidate = m.group(1)
+            for word in [candidate] + WhiteListMatcher.prefixes.get(candidate, []):
+                if word not in matched and WhiteListMatcher.patterns[word].match(line):
+                    matched.add(word)
+        return matched
+
+
+    @staticmethod
+    async def changed_words(added_lines: List[str], deleted_lines: List[str]) -> List[str]:
+        """Whitelist words touched by a config change, in whitelist order."""
+        await WhiteListMatcher.load()
+        matched = WhiteListMatcher.match_lines(added_lines) | WhiteListMatcher.match_lines(deleted_lines)
+        return [word for word in WhiteListMatcher.words or [] if word in matched]
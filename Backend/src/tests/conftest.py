@@ -0,0 +1,9 @@
+import os
+
+
+# Settings require the database URLs; unit tests never connect to them.
+# Set TEST_POSTGRES_URL to also run the repository tests against a scratch database.
+if os.environ.get("TEST_POSTGRES_URL"):
+    os.environ["POSTGRES_URL"] = os.environ["TEST_POSTGRES_URL"]
+os.environ.setdefault("POSTGRES_URL", "postgresql+asyncpg://localhost/test")
+os.environ.setdefault("MONGO_URL", "mongodb://localhost:27017")
@@ -0,0 +1,41 @@
+from src.services.commands import CommandPlanner
+import threading
+
+
+class FakeConnection:
+    def __init__(self, host):
+        self.host = host
+
+    def send_command(self, command):
+        return f"{self.host} {command}"
+
+
+def test_forget_and_ips_while_executor_threads_send(monkeypatch):
+    monkeypatch.setattr(CommandPlanner, "outputs", {})
+    stop = threading.Event()
+    errors = []
+
+    def send_commands(worker):
+        try:
+            count = 0
+            while not stop.is_set():
+                connection = FakeConnection(f"10.{worker}.{count % 250}.1")
+                CommandPlanner.send(connection, f"show interfaces {count % 20}", max_age=0)
+                count += 1
+        except Exception as e:
+            errors.append(e)
+
+    threads = [threading.Thread(target=send_commands, args=(worker,)) for worker in range(4)]
+    for thread in threads:
+        thread.start()
+    try:
+        for _ in range(300):
+            CommandPlanner.ips()
+            CommandPlanner.forget("10.0.0.1")
+    finally:
+        stop.set()
+        for thread in threads:
+            thread.join()
+
+    assert errors == []
+    assert CommandPlanner.outputs
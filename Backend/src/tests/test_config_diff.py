@@ -0,0 +1,112 @@
+from src.utils import config_diff
+from src.utils.config_diff import (
+    diff_lines,
+    reverse_delta,
+    apply_reverse_delta,
+    compress_config,
+    decompress_config,
+    config_fingerprint,
+)
+import random
+
+
+def unchanged_lines(lines, changed_indexes):
+    changed = set(changed_indexes)
+    return [line for index, line in enumerate(lines) if index not in changed]
+
+
+def random_config(rng, length):
+    # Small alphabet with "!" and "exit" so most lines repeat, like real configurations
+    words = ["!", "!", "exit", "interface Gi0/1", "shutdown", "no shutdown", "description uplink", "ip address 10.0.0.1"]
+    return [rng.choice(words) for _ in range(length)]
+
+
+def mutate(rng, lines):
+    lines = list(lines)
+    for _ in range(rng.randint(0, 6)):
+        operation = rng.choice(["insert", "delete", "replace"])
+        position = rng.randint(0, len(lines))
+        if operation == "insert":
+            lines.insert(position, f"vlan {rng.randint(1, 20)}")
+        elif lines and position < len(lines):
+            if operation == "delete":
+                del lines[position]
+            else:
+                lines[position] = f"hostname r{rng.randint(1, 5)}"
+    return lines
+
+
+def test_diff_identical_configs():
+    lines = ["hostname r1", "!", "interface Gi0/1", "!"]
+    assert diff_lines(lines, list(lines)) == ([], [])
+
+
+def test_diff_reports_positions_of_repeated_lines():
+    old = ["hostname r1", "!", "interface Gi0/1", "!", "end"]
+    new = ["hostname r1", "!", "interface Gi0/1", "shutdown", "!", "!", "end"]
+    deleted, added = diff_lines(old, new)
+    assert deleted == []
+    assert sorted(new[index] for index in added) == ["!", "shutdown"]
+    assert unchanged_lines(old, deleted) == unchanged_lines(new, added)
+
+
+def test_diff_keeps_common_subsequence():
+    rng = random.Random(17)
+    for _ in range(300):
+        old = random_config(rng, rng.randint(0, 40))
+        new = mutate(rng, old)
+        deleted, added = diff_lines(old, new)
+        assert deleted == sorted(set(deleted))
+        assert added == sorted(set(added))
+        assert unchanged_lines(old, deleted) == unchanged_lines(new, added)
+
+
+def test_myers_falls_back_to_full_replacement(monkeypatch):
+    # No line is unique, so there are no patience anchors and the region goes to Myers
+    old = ["exit", "!"] * 12 + ["exit"]
+    new = ["!"] * 12
+
+    deleted, added = diff_lines(old, new)
+    assert deleted == list(range(0, 25, 2))
+    assert added == []
+
+    # 13 edits are needed; past the limit the whole region is reported as replaced
+    monkeypatch.setattr(config_diff, "MYERS_MAX_EDITS", 5)
+    deleted, added = diff_lines(old, new)
+    assert deleted == list(range(len(old)))
+    assert added == list(range(len(new)))
+
+
+def test_reverse_delta_round_trip():
+    cases = [
+        ("", ""),
+        ("hostname r1\n", ""),
+        ("", "hostname r1\n"),
+        ("hostname r2\n!\ninterface Gi0/1\n shutdown\n!\nend\n", "hostname r1\n!\ninterface Gi0/1\n!\nend\n"),
+        ("hostname r1\r\n!\r\nend", "hostname r1\r\n!\r\n!\r\nend\r\n"),
+        ("banner motd ^C\nsigné\n^C\n", "banner motd ^C\n^C\n"),
+    ]
+    for newer, older in cases:
+        assert apply_reverse_delta(newer, reverse_delta(newer, older)) == older
+
+
+def test_reverse_delta_round_trip_random():
+    rng = random.Random(21)
+    for _ in range(300):
+        older_lines = random_config(rng, rng.randint(0, 40))
+        newer_lines = mutate(rng, older_lines)
+        older = "\n".join(older_lines) + rng.choice(["", "\n"])
+        newer = "\n".join(newer_lines) + rng.choice(["", "\n"])
+        assert apply_reverse_delta(newer, reverse_delta(newer, older)) == older
+
+
+def test_compress_round_trip():
+    config = "hostname r1\n!\ninterface Gi0/1\n description uplink\n!\n" * 50
+    assert decompress_config(compress_config(config)) == config
+
+
+def test_fingerprint_ignores_noisy_lines():
+    config = "hostname r1\n!\ninterface Gi0/1\n"
+    noisy = "Building configuration...\n!! Last configuration change at 10:00:00\n  hostname r1  \n\n!\ninterface Gi0/1\n"
+    assert config_fingerprint(config) == config_fingerprint(noisy)
+    assert config_fingerprint(config) != config_fingerprint(config + " shutdown\n")
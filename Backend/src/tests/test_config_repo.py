@@ -0,0 +1,107 @@
+import os
+import pytest
+
+# Needs a real Postgres: the test is about row locking between concurrent transactions
+if not os.environ.get("TEST_POSTGRES_URL"):
+    pytest.skip("TEST_POSTGRES_URL is not set", allow_module_level=True)
+
+from src.config.postgres import engine, AsyncSessionLocal
+from src.db.postgres.base import Base
+from src.db.postgres.migrations.schema import upgrade_schema
+from src.models.postgres.device import Device
+from src.repositories.postgres.config import ConfigRepo
+from src.utils.config_diff import config_fingerprint
+from datetime import datetime, timedelta
+import asyncio
+import uuid
+
+
+BASE = "hostname r1\n!\ninterface Gi0/1\n description uplink\n!\nend\n"
+FIRST = "hostname r1\n!\ninterface Gi0/1\n description uplink\n shutdown\n!\nend\n"
+SECOND = "hostname r2\n!\ninterface Gi0/1\n!\ninterface Gi0/2\n description backup\n!\nend\n"
+
+
+async def create_device() -> str:
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+        await upgrade_schema(conn)
+    mac_address = uuid.uuid4().hex[:12]
+    async with AsyncSessionLocal() as session:
+        session.add(Device(mac=mac_address, status="active"))
+        await session.commit()
+    return mac_address
+
+
+async def save(mac_address: str, configuration: str, queried_at: datetime) -> bool:
+    return await ConfigRepo.save_config(mac_address, configuration, queried_at, config_fingerprint(configuration))
+
+
+async def versions(mac_address: str) -> list:
+    """Current configuration followed by every archived version, newest first."""
+    texts = [(await ConfigRepo.get_latest_config(mac_address))["configuration"]]
+    page = await ConfigRepo.get_history_page(mac_address, limit=100)
+    for item in page["items"]:
+        texts.append((await ConfigRepo.get_config_version(mac_address, item["id"]))["configuration"])
+    return texts
+
+
+def test_concurrent_saves_keep_the_archive_chain():
+    async def scenario():
+        try:
+            mac_address = await create_device()
+            now = datetime.now()
+            assert await save(mac_address, BASE, now) is True
+
+            results = await asyncio.gather(
+                save(mac_address, FIRST, now + timedelta(seconds=1)),
+                save(mac_address, SECOND, now + timedelta(seconds=2)),
+            )
+            assert results == [True, True]
+
+            texts = await versions(mac_address)
+            assert len(texts) == 3
+            assert sorted(texts[:2]) == sorted([FIRST, SECOND])
+            assert texts[2] == BASE
+        finally:
+            await engine.dispose()
+
+    asyncio.run(scenario())
+
+
+def test_concurrent_saves_of_the_same_configuration_archive_once():
+    async def scenario():
+        try:
+            mac_address = await create_device()
+            now = datetime.now()
+            assert await save(mac_address, BASE, now) is True
+
+            results = await asyncio.gather(
+                save(mac_address, FIRST, now + timedelta(seconds=1)),
+                save(mac_address, FIRST, now + timedelta(seconds=2)),
+            )
+            assert sorted(results) == [False, True]
+            assert await versions(mac_address) == [FIRST, BASE]
+        finally:
+            await engine.dispose()
+
+    asyncio.run(scenario())
+
+
+def test_concurrent_first_saves_archive_against_each_other():
+    async def scenario():
+        try:
+            mac_address = await create_device()
+            now = datetime.now()
+
+            results = await asyncio.gather(
+                save(mac_address, FIRST, now),
+                save(mac_address, SECOND, now + timedelta(seconds=1)),
+            )
+            assert results == [True, True]
+
+            texts = await versions(mac_address)
+            assert sorted(texts) == sorted([FIRST, SECOND])
+        finally:
+            await engine.dispose()
+
+    asyncio.run(scenario())
@@ -0,0 +1,99 @@
+from src.services.rates import RateService
+from src.services.connection import ConnectionService
+from src.config.settings import settings
+import asyncio
+import pytest
+
+
+MAX64 = RateService.COUNTER64_MODULUS
+MAX32 = RateService.TIMETICKS_MODULUS
+
+
+@pytest.fixture(autouse=True)
+def reset_samples(monkeypatch):
+    monkeypatch.setattr(RateService, "samples", {})
+
+
+def test_counter_delta_without_wrap():
+    assert RateService.counter_delta(1000, 1000) == 0
+    assert RateService.counter_delta(1000, 4000) == 3000
+
+
+def test_counter_delta_across_64bit_wrap():
+    assert RateService.counter_delta(MAX64 - 100, 50) == 150
+    assert RateService.counter_delta(MAX64 - 1, 0) == 1
+
+
+def test_counter_delta_reset_is_not_a_wrap():
+    # Counters cleared: a "wrap" would mean more than half the counter space went by
+    assert RateService.counter_delta(10 ** 12, 5) is None
+    assert RateService.counter_delta(MAX64 // 2 - 10, 0) is None
+
+
+def test_agent_restarted_when_uptime_goes_back():
+    assert RateService.agent_restarted(500_000, 100, 10) is True
+
+
+def test_agent_not_restarted_on_timeticks_wrap():
+    # 10 s = 1000 ticks after MAX32 - 500 lands past the 32-bit wrap
+    assert RateService.agent_restarted(MAX32 - 500, 500, 10) is False
+
+
+def test_agent_restarted_ignores_missing_or_increasing_uptime():
+    assert RateService.agent_restarted(None, 100, 10) is False
+    assert RateService.agent_restarted(100, None, 10) is False
+    assert RateService.agent_restarted(100, 1100, 10) is False
+
+
+def test_update_computes_rates_from_consecutive_samples():
+    assert RateService.update("10.0.0.1", {"1": {"in_octets": 0, "out_octets": 0}}, 1000, now=100.0) == {}
+
+    rates = RateService.update("10.0.0.1", {"1": {"in_octets": 12_500_000, "out_octets": 1_250_000}}, 2000, now=110.0)
+    assert rates["1"]["mbps_received"] == pytest.approx(10.0)
+    assert rates["1"]["mbps_sent"] == pytest.approx(1.0)
+    assert rates["1"]["interval"] == 10.0
+
+
+def test_update_across_counter_wrap():
+    RateService.update("10.0.0.1", {"1": {"in_octets": MAX64 - 1_250_000, "out_octets": 0}}, 1000, now=0.0)
+    rates = RateService.update("10.0.0.1", {"1": {"in_octets": 1_250_000, "out_octets": 0}}, 2000, now=10.0)
+    assert rates["1"]["mbps_received"] == pytest.approx(2.0)
+
+
+def test_update_discards_samples_across_agent_restart():
+    RateService.update("10.0.0.1", {"1": {"in_octets": 10 ** 9, "out_octets": 10 ** 9}}, 500_000, now=0.0)
+    assert RateService.update("10.0.0.1", {"1": {"in_octets": 100, "out_octets": 100}}, 300, now=10.0) == {}
+
+    # The post-restart sample seeds the next computation
+    rates = RateService.update("10.0.0.1", {"1": {"in_octets": 1_250_100, "out_octets": 100}}, 1300, now=20.0)
+    assert rates["1"]["mbps_received"] == pytest.approx(1.0)
+
+
+def test_unreachable_device_forgets_its_samples(monkeypatch):
+    RateService.update("10.0.0.1", {"1": {"in_octets": 0, "out_octets": 0}}, 1000, now=0.0)
+    RateService.update("10.0.0.2", {"1": {"in_octets": 0, "out_octets": 0}}, 1000, now=0.0)
+
+    async def get_sys_uptime(ip, snmp_password):
+        return None
+
+    async def get_counter_snapshot(ip, snmp_password):
+        return None
+
+    monkeypatch.setattr(ConnectionService, "get_sys_uptime", get_sys_uptime)
+    monkeypatch.setattr(ConnectionService, "get_counter_snapshot", get_counter_snapshot)
+
+    assert asyncio.run(RateService.sample_device("10.0.0.1", "secret")) is None
+    assert RateService.ips() == {"10.0.0.2"}
+
+
+def test_update_keeps_previous_sample_within_min_interval(monkeypatch):
+    monkeypatch.setattr(settings, "mbps_min_interval", 10)
+    RateService.update("10.0.0.1", {"1": {"in_octets": 0, "out_octets": 0}}, 1000, now=100.0)
+
+    # A device refresh right after the Mbps poll: no rate, and the stored sample is kept
+    assert RateService.update("10.0.0.1", {"1": {"in_octets": 125_000, "out_octets": 0}}, 1050, now=100.5) == {}
+    assert RateService.samples[("10.0.0.1", "1")]["monotonic"] == 100.0
+
+    rates = RateService.update("10.0.0.1", {"1": {"in_octets": 12_500_000, "out_octets": 0}}, 2000, now=110.0)
+    assert rates["1"]["mbps_received"] == pytest.approx(10.0)
+    assert rates["1"]["interval"] == 10.0
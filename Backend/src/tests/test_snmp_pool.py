@@ -0,0 +1,60 @@
+from src.utils.snmp import SnmpEnginePool
+from pysnmp.hlapi.v3arch.asyncio.cmdgen import LCD
+import asyncio
+import pytest
+
+
+@pytest.fixture(autouse=True)
+def reset_pool(monkeypatch):
+    monkeypatch.setattr(SnmpEnginePool, "engines", [])
+    monkeypatch.setattr(SnmpEnginePool, "targets", {})
+    monkeypatch.setattr(SnmpEnginePool, "last_sweep", 0.0)
+
+
+def test_unconfigure_removes_target_and_keeps_shared_transport(monkeypatch):
+    # _unconfigure edits pysnmp's LCD cache; this fails if an upgrade changes its layout
+    monkeypatch.setattr("src.utils.snmp.settings.snmp_engine_pool_size", 1)
+
+    async def scenario():
+        ips = ["127.0.0.1", "127.0.0.2"]
+        for ip in ips:
+            engine, auth, transport = await SnmpEnginePool.target(ip, "public")
+            # Every hlapi request configures the target again and bumps its use counters
+            for _ in range(3):
+                LCD.configure(engine, auth, transport)
+
+        cache = LCD._get_cache(engine)
+        assert len(cache["auth"]) == 2
+        assert len(cache["parm"]) == 2
+        assert len(cache["addr"]) == 2
+
+        removed_name = SnmpEnginePool.security_name(ips[0])
+        SnmpEnginePool._unconfigure(ips[0])
+
+        assert len(cache["auth"]) == 1
+        assert [key[0] for key in cache["parm"]] == [SnmpEnginePool.security_name(ips[1])]
+        assert len(cache["addr"]) == 1
+        assert all(removed_name not in str(key) for key in cache["addr"])
+        # The UDP transport is shared by the engine's other targets and stays open
+        assert len(cache["tran"]) == 1
+        assert SnmpEnginePool.targets[ips[0]]["auth"] is None
+
+        # The evicted target can be configured again
+        engine, auth, transport = await SnmpEnginePool.target(ips[0], "public")
+        LCD.configure(engine, auth, transport)
+        assert len(cache["parm"]) == 2
+
+        for transport, _ in cache["tran"].values():
+            transport.close_transport()
+
+    asyncio.run(scenario())
+
+
+def test_stats_counts_targets_per_engine(monkeypatch):
+    monkeypatch.setattr("src.utils.snmp.settings.snmp_engine_pool_size", 2)
+    for ip in ["10.0.0.1", "10.0.0.2", "10.0.0.3"]:
+        SnmpEnginePool.get_engine(ip)
+    stats = SnmpEnginePool.stats()
+    assert stats["engines"] == 2
+    assert stats["targets"] == 3
+    assert sorted(stats["targets_per_engine"]) == [1, 2]
@@ -0,0 +1,64 @@
+import pytest
+
+# The matcher's repository pulls in SQLAlchemy's asyncio engine
+pytest.importorskip("greenlet")
+
+from src.services.white_list_matcher import WhiteListMatcher
+from src.repositories.postgres.white_list import WhiteListRepo
+import asyncio
+
+
+@pytest.fixture(autouse=True)
+def reset_matcher():
+    yield
+    WhiteListMatcher.build([])
+    WhiteListMatcher.invalidate()
+
+
+def test_words_match_on_word_boundaries():
+    WhiteListMatcher.build(["interface", "ip route"])
+    assert WhiteListMatcher.match_lines(["interface Gi0/1"]) == {"interface"}
+    assert WhiteListMatcher.match_lines(["  interface Gi0/1"]) == {"interface"}
+    assert WhiteListMatcher.match_lines(["interfaces Gi0/1", "ip router ospf 1"]) == set()
+    assert WhiteListMatcher.match_lines(["description interface uplink"]) == set()
+
+
+def test_prefix_words_match_the_same_line():
+    WhiteListMatcher.build(["ip", "ip route", "ip routing"])
+    assert WhiteListMatcher.match_lines(["ip route 0.0.0.0 0.0.0.0 10.0.0.1"]) == {"ip", "ip route"}
+    assert WhiteListMatcher.match_lines(["ip routing"]) == {"ip", "ip routing"}
+    assert WhiteListMatcher.match_lines(["ip address 10.0.0.1 255.255.255.0"]) == {"ip"}
+    assert WhiteListMatcher.match_lines(["iproute"]) == set()
+
+
+def test_words_are_matched_literally():
+    WhiteListMatcher.build(["a.b", "", "  ", "a.b"])
+    assert WhiteListMatcher.words == ["a.b"]
+    assert WhiteListMatcher.match_lines(["a.b c"]) == {"a.b"}
+    assert WhiteListMatcher.match_lines(["axb c", None]) == set()
+
+
+def test_empty_whitelist_matches_nothing():
+    WhiteListMatcher.build([])
+    assert WhiteListMatcher.match_lines(["interface Gi0/1"]) == set()
+
+
+def test_changed_words_loads_once_and_reloads_after_invalidate(monkeypatch):
+    white_lists = [["snmp-server", "interface"], ["hostname"]]
+    calls = []
+
+    async def get_white_list():
+        calls.append(1)
+        return [{"words": word} for word in white_lists[len(calls) - 1]]
+
+    monkeypatch.setattr(WhiteListRepo, "get_white_list", get_white_list)
+    WhiteListMatcher.invalidate()
+
+    added = ["interface Gi0/2", "snmp-server community x RO"]
+    assert asyncio.run(WhiteListMatcher.changed_words(added, [])) == ["snmp-server", "interface"]
+    assert asyncio.run(WhiteListMatcher.changed_words([], ["interface Gi0/1"])) == ["interface"]
+    assert len(calls) == 1
+
+    WhiteListMatcher.invalidate()
+    assert asyncio.run(WhiteListMatcher.changed_words(added, ["hostname r1"])) == ["hostname"]
+    assert len(calls) == 2
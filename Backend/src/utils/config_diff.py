@@ -0,0 +1,236 @@
+from typing import List, Tuple, Dict, Sequence
+import hashlib
+import json
+import re
+import zlib
+
+
+# Regions with more edits than this are reported as fully replaced instead of running Myers further
+MYERS_MAX_EDITS = 1000
+
+# Lines that change without the configuration changing (IOS XR timestamp, build banners)
+NOISY_LINE = re.compile(
+    r"[A-Z][a-z]{2}\s[A-Z][a-z]{2}\s+\d+\s\d{2}:\d{2}:\d{2}"
+    r"|Building configuration"
+    r"|!! IOS XR Configuration"
+    r"|!! Last configuration change"
+)
+
+
+def normalize_config(config: str) -> str:
+    """
+    Remove non-meaningful lines (timestamps, build info, etc.)
+    so configs can be compared meaningfully.
+    """
+    normalized_lines = []
+    for line in config.splitlines():
+        line = line.strip()
+        if line and not NOISY_LINE.match(line):
+            normalized_lines.append(line)
+    return "\n".join(normalized_lines)
+
+
+def config_fingerprint(config: str) -> str:
+    """sha256 of the normalized configuration, stored in Config.config_hash."""
+    return hashlib.sha256(normalize_config(config).encode("utf-8", "surrogateescape")).hexdigest()
+
+
+def diff_lines(old_lines: Sequence[str], new_lines: Sequence[str]) -> Tuple[List[int], List[int]]:
+    """
+    Positional line diff between two configurations.
+    Uses patience diff (lines that occur exactly once on both sides anchor the alignment) and
+    falls back to Myers for regions without such anchors, e.g. runs of "!" or "exit".
+    Lines are interned to integers first, so every comparison is O(1).
+
+    Returns (deleted_indexes, added_indexes): ascending indexes into old_lines of deleted lines
+    and into new_lines of added lines.
+    """
+    ids: Dict[str, int] = {}
+    a = [ids.setdefault(line, len(ids)) for line in old_lines]
+    b = [ids.setdefault(line, len(ids)) for line in new_lines]
+
+    deleted: List[int] = []
+    added: List[int] = []
+    regions = [(0, len(a), 0, len(b))]
+    while regions:
+        a_lo, a_hi, b_lo, b_hi = regions.pop()
+
+        # Common prefix and suffix are unchanged
+        while a_lo < a_hi and b_lo < b_hi and a[a_lo] == b[b_lo]:
+            a_lo += 1
+            b_lo += 1
+        while a_lo < a_hi and b_lo < b_hi and a[a_hi - 1] == b[b_hi - 1]:
+            a_hi -= 1
+            b_hi -= 1
+
+        if a_lo == a_hi:
+            added.extend(range(b_lo, b_hi))
+            continue
+        if b_lo == b_hi:
+            deleted.extend(range(a_lo, a_hi))
+            continue
+
+        anchors = patience_anchors(a, a_lo, a_hi, b, b_lo, b_hi)
+        if not anchors:
+            myers(a, a_lo, a_hi, b, b_lo, b_hi, deleted, added)
+            continue
+
+        # Diff the gaps between consecutive anchors; the anchors themselves are unchanged lines
+        prev_a, prev_b = a_lo, b_lo
+        for i, j in anchors:
+            regions.append((prev_a, i, prev_b, j))
+            prev_a, prev_b = i + 1, j + 1
+        regions.append((prev_a, a_hi, prev_b, b_hi))
+
+    deleted.sort()
+    added.sort()
+    return deleted, added
+
+
+def patience_anchors(a: List[int], a_lo: int, a_hi: int, b: List[int], b_lo: int, b_hi: int) -> List[Tuple[int, int]]:
+    """
+    Longest increasing sequence of lines that are unique in both regions, as (index in a, index in b).
+    """
+    counts: Dict[int, List[int]] = {}
+    for i in range(a_lo, a_hi):
+        entry = counts.get(a[i])
+        if entry is None:
+            counts[a[i]] = [1, i, 0, -1]
+        else:
+            entry[0] += 1
+    for j in range(b_lo, b_hi):
+        entry = counts.get(b[j])
+        if entry is not None:
+            entry[2] += 1
+            entry[3] = j
+
+    pairs = [(entry[1], entry[3]) for entry in counts.values() if entry[0] == 1 and entry[2] == 1]
+    if not pairs:
+        return []
+    pairs.sort()
+
+    # Patience sorting: tails[k] is the pair index ending the best increasing run of length k + 1
+    tails: List[int] = []
+    tail_values: List[int] = []
+    previous = [-1] * len(pairs)
+    for index, (_, j) in enumerate(pairs):
+        lo, hi = 0, len(tail_values)
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if tail_values[mid] < j:
+                lo = mid + 1
+            else:
+                hi = mid
+        if lo > 0:
+            previous[index] = tails[lo - 1]
+        if lo == len(tails):
+            tails.append(index)
+            tail_values.append(j)
+        else:
+            tails[lo] = index
+            tail_values[lo] = j
+
+    anchors = []
+    index = tails[-1]
+    while index != -1:
+        anchors.append(pairs[index])
+        index = previous[index]
+    anchors.reverse()
+    return anchors
+
+
+def myers(a: List[int], a_lo: int, a_hi: int, b: List[int], b_lo: int, b_hi: int, deleted: List[int], added: List[int]) -> None:
+    """Shortest edit script of a region (Myers O(ND)), appended to deleted/added as absolute indexes."""
+    n, m = a_hi - a_lo, b_hi - b_lo
+    max_edits = min(n + m, MYERS_MAX_EDITS)
+    v = {1: 0}
+    trace = []
+    for d in range(max_edits + 1):
+        trace.append(dict(v))
+        for k in range(-d, d + 1, 2):
+            if k == -d or (k != d and v[k - 1] < v[k + 1]):
+                x = v[k + 1]
+            else:
+                x = v[k - 1] + 1
+            y = x - k
+            while x < n and y < m and a[a_lo + x] == b[b_lo + y]:
+                x += 1
+                y += 1
+            v[k] = x
+            if x >= n and y >= m:
+                # Walk the trace back from the end to recover the edits
+                for step in range(d, 0, -1):
+                    previous = trace[step]
+                    k = x - y
+                    if k == -step or (k != step and previous[k - 1] < previous[k + 1]):
+                        prev_k = k + 1
+                    else:
+                        prev_k = k - 1
+                    prev_x = previous[prev_k]
+                    prev_y = prev_x - prev_k
+                    if prev_k == k + 1:
+                        added.append(b_lo + prev_y)
+                    else:
+                        deleted.append(a_lo + prev_x)
+                    x, y = prev_x, prev_y
+                return
+
+    # Too different to align cheaply: report the whole region as replaced
+    deleted.extend(range(a_lo, a_hi))
+    added.extend(range(b_lo, b_hi))
+
+
+def reverse_delta(newer: str, older: str) -> bytes:
+    """
+    zlib-compressed edit script that rebuilds `older` from `newer`.
+    Hunks are [start, removed, inserted lines]: at line `start` of newer, drop `removed` lines
+    and insert the given lines. Lines keep their line endings, so rebuilding is exact.
+    """
+    newer_lines = newer.splitlines(keepends=True)
+    older_lines = older.splitlines(keepends=True)
+    deleted, added = diff_lines(newer_lines, older_lines)
+
+    hunks = []
+    d = a = 0
+    i = j = 0
+    while d < len(deleted) or a < len(added):
+        # Skip to the next change; lines in between are common to both versions
+        step = min(deleted[d] - i if d < len(deleted) else len(newer_lines), added[a] - j if a < len(added) else len(older_lines))
+        i += step
+        j += step
+
+        start, removed, inserted = i, 0, []
+        while d < len(deleted) and deleted[d] == i:
+            d += 1
+            i += 1
+            removed += 1
+        while a < len(added) and added[a] == j:
+            inserted.append(older_lines[j])
+            a += 1
+            j += 1
+        hunks.append([start, removed, inserted])
+
+    return zlib.compress(json.dumps(hunks, separators=(",", ":")).encode("utf-8", "surrogateescape"))
+
+
+def apply_reverse_delta(newer: str, delta: bytes) -> str:
+    """Rebuild the older configuration from `newer` and a reverse_delta."""
+    newer_lines = newer.splitlines(keepends=True)
+    hunks = json.loads(zlib.decompress(delta).decode("utf-8", "surrogateescape"))
+
+    lines: List[str] = []
+    position = 0
+    for start, removed, inserted in hunks:
+        lines.extend(newer_lines[position:start])
+        lines.extend(inserted)
+        position = start + removed
+    lines.extend(newer_lines[position:])
+    return "".join(lines)
+
+
+def compress_config(config: str) -> bytes:
+    return zlib.compress(config.encode("utf-8", "surrogateescape"))
+
+
+def decompress_config(payload: bytes) -> str:
+    return zlib.decompress(payload).decode("utf-8", "surrogateescape")
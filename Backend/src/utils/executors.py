@@ -0,0 +1,54 @@
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from src.config.settings import settings
+from typing import Any, Callable, Optional
+import multiprocessing
+import asyncio
+import functools
+
+
+# Dedicated pool for blocking Netmiko/SSH work, sized independently of the default executor
+cli_executor = ThreadPoolExecutor(max_workers=settings.cli_max_workers, thread_name_prefix="cli")
+
+# Worker processes for CPU-bound parsing of large CLI outputs, started on first use
+parse_executor: Optional[ProcessPoolExecutor] = None
+
+
+async def run_in_cli_executor(func: Callable[..., Any], *args: Any, **kwargs: Any) -> Any:
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(cli_executor, functools.partial(func, *args, **kwargs))
+
+
+def get_parse_executor() -> ProcessPoolExecutor:
+    global parse_executor
+    if parse_executor is None:
+        # spawn: workers start clean instead of forking a process that already runs threads and DB clients
+        parse_executor = ProcessPoolExecutor(max_workers=settings.parse_max_workers, mp_context=multiprocessing.get_context("spawn"))
+    return parse_executor
+
+
+async def run_parse(func: Callable[..., Any], *args: Any) -> Any:
+    """
+    Run a parser (e.g. an ExtractionService method) on CLI outputs.
+    Small outputs are parsed inline; once the outputs add up to `parse_offload_threshold`
+    characters they are parsed in the process pool so the event loop keeps running.
+    func must be picklable, i.e. a module-level function or a staticmethod.
+    """
+    size = sum(len(arg) for arg in args if isinstance(arg, str))
+    if size < settings.parse_offload_threshold:
+        return func(*args)
+
+    global parse_executor
+    loop = asyncio.get_running_loop()
+    try:
+        return await loop.run_in_executor(get_parse_executor(), func, *args)
+    except BrokenProcessPool:
+        print("Parse worker pool broke, parsing inline and restarting it on next use")
+        parse_executor = None
+        return func(*args)
+
+
+def shutdown_executors() -> None:
+    cli_executor.shutdown(wait=False, cancel_futures=True)
+    if parse_executor is not None:
+        parse_executor.shutdown(wait=False, cancel_futures=True)
@@ -1,6 +1,157 @@
-# _snmp_engines = {}
+from pysnmp.hlapi.v3arch.asyncio import SnmpEngine, CommunityData, UdpTransportTarget
+from pysnmp.hlapi.v3arch.asyncio.cmdgen import LCD
+from src.config.settings import settings
+from typing import Optional, Dict, List, Tuple, Any
+import time
 
-# def get_snmp_engine(ip):
-#     if ip not in _snmp_engines:
-#         _snmp_engines[ip] = SnmpEngine()
-#     return _snmp_engines[ip]
\ No newline at end of file
+
+class SnmpEnginePool:
+    """
+    Small, bounded set of SnmpEngines shared by every SNMP target.
+    Each target is pinned to one engine and gets its own security name and tag
+    ("area-<ip>"), so many targets with the same community string can share an
+    engine and its single UDP transport without their responses being mixed up.
+    Targets that have not been polled for `snmp_target_idle_timeout` seconds are
+    removed from their engine's local configuration.
+    The CommunityData and resolved UdpTransportTarget of each target are cached and
+    rebuilt only after `snmp_target_ttl` seconds or when the community changes.
+    """
+
+    engines: List[SnmpEngine] = []
+    # ip -> {"engine": engine index, "community": community string, "auth": CommunityData,
+    #        "transport": UdpTransportTarget, "created": monotonic time, "last_used": monotonic time}
+    targets: Dict[str, Dict[str, Any]] = {}
+    last_sweep: float = 0.0
+
+
+    @staticmethod
+    def security_name(ip: str) -> str:
+        return f"area-{ip}"
+
+
+    @staticmethod
+    def get_engine(ip: str) -> SnmpEngine:
+        """Return the engine a target is pinned to, assigning the least loaded engine on first use."""
+        now = time.monotonic()
+        SnmpEnginePool.evict_idle(now)
+
+        target = SnmpEnginePool.targets.get(ip)
+        if target is None:
+            target = {"engine": SnmpEnginePool._least_loaded_engine(), "community": None, "auth": None, "transport": None, "created": now, "last_used": now}
+            SnmpEnginePool.targets[ip] = target
+        target["last_used"] = now
+        return SnmpEnginePool.engines[target["engine"]]
+
+
+    @staticmethod
+    async def target(ip: str, snmp_password: str, port: int = 161) -> Tuple[SnmpEngine, CommunityData, UdpTransportTarget]:
+        """
+        Engine, credentials and transport for a target, ready to pass to the hlapi commands.
+        Served from the per-target cache; rebuilt when the TTL expires or the community changes.
+        """
+        engine = SnmpEnginePool.get_engine(ip)
+        target = SnmpEnginePool.targets[ip]
+        now = target["last_used"]
+        expired = now - target["created"] > settings.snmp_target_ttl
+        if target["auth"] is None or target["transport"] is None or target["community"] != snmp_password or expired:
+            auth = SnmpEnginePool.community(ip, snmp_password)
+            transport = await SnmpEnginePool.transport(ip, port)
+            target["auth"] = auth
+            target["transport"] = transport
+            target["created"] = now
+        return engine, target["auth"], target["transport"]
+
+
+    @staticmethod
+    def community(ip: str, snmp_password: str) -> CommunityData:
+        """v2c credentials for a target, using its per-target security name and tag."""
+        name = SnmpEnginePool.security_name(ip)
+        target = SnmpEnginePool.targets.get(ip)
+        if target is not None and target["community"] is not None and target["community"] != snmp_password:
+            # Community changed - drop the old entry, the engine would otherwise keep using it
+            SnmpEnginePool._unconfigure(ip)
+            target = SnmpEnginePool.targets.get(ip)
+
+        auth = CommunityData(name, snmp_password, mpModel=1, tag=name)
+        if target is not None:
+            target["community"] = snmp_password
+            target["auth"] = auth
+        return auth
+
+
+    @staticmethod
+    async def transport(ip: str, port: int = 161) -> UdpTransportTarget:
+        """UDP target tagged with the target's security name (matches its CommunityData tag)."""
+        return await UdpTransportTarget.create((ip, port), tagList=SnmpEnginePool.security_name(ip))
+
+
+    @staticmethod
+    def evict_idle(now: Optional[float] = None) -> int:
+        """Remove targets idle for longer than the configured timeout. Returns how many were evicted."""
+        now = time.monotonic() if now is None else now
+        # Sweeping is cheap but there is no point doing it on every request
+        if now - SnmpEnginePool.last_sweep < 60:
+            return 0
+        SnmpEnginePool.last_sweep = now
+
+        idle = [ip for ip, target in SnmpEnginePool.targets.items() if now - target["last_used"] > settings.snmp_target_idle_timeout]
+        for ip in idle:
+            SnmpEnginePool._unconfigure(ip)
+            SnmpEnginePool.targets.pop(ip, None)
+        if idle:
+            print(f"Evicted {len(idle)} idle SNMP targets")
+        return len(idle)
+
+
+    @staticmethod
+    def stats() -> Dict[str, Any]:
+        loads = [0] * len(SnmpEnginePool.engines)
+        for target in SnmpEnginePool.targets.values():
+            loads[target["engine"]] += 1
+        return {"engines": len(SnmpEnginePool.engines), "targets": len(SnmpEnginePool.targets), "targets_per_engine": loads}
+
+
+    @staticmethod
+    def _least_loaded_engine() -> int:
+        # Engines are created lazily, up to the configured pool size
+        if len(SnmpEnginePool.engines) < max(1, settings.snmp_engine_pool_size):
+            SnmpEnginePool.engines.append(SnmpEngine())
+            return len(SnmpEnginePool.engines) - 1
+        loads = [0] * len(SnmpEnginePool.engines)
+        for target in SnmpEnginePool.targets.values():
+            loads[target["engine"]] += 1
+        return loads.index(min(loads))
+
+
+    @staticmethod
+    def _unconfigure(ip: str) -> None:
+        """Remove a target's community, target params and target address from its engine."""
+        target = SnmpEnginePool.targets.get(ip)
+        if target is None or target["auth"] is None:
+            return
+        engine = SnmpEnginePool.engines[target["engine"]]
+        auth = target["auth"]
+        try:
+            # The hlapi LCD bumps a use counter on every request, so a plain unconfigure()
+            # would only decrement it. Reset this target's entries to a single use first.
+            # This relies on the LCD cache layout of the pysnmp version pinned in requirements.txt,
+            # checked by tests/test_snmp_pool.py.
+            cache = LCD._get_cache(engine)
+            params_key = (auth.securityName, auth.security_level, auth.message_processing_model)
+            if params_key in cache["parm"]:
+                params_name, _ = cache["parm"][params_key]
+                cache["parm"][params_key] = params_name, 1
+                for addr_key, (addr_name, _) in list(cache["addr"].items()):
+                    if addr_key[0] == params_name:
+                        cache["addr"][addr_key] = addr_name, 1
+                        # Keep the engine's shared UDP transport open for the other targets
+                        if addr_key[1] in cache["tran"]:
+                            transport, use_count = cache["tran"][addr_key[1]]
+                            cache["tran"][addr_key[1]] = transport, max(use_count, 2)
+            if auth.communityIndex in cache["auth"]:
+                LCD.unconfigure(engine, auth)
+        except Exception as e:
+            print(f"Error removing SNMP target {ip} from its engine: {e}")
+        target["community"] = None
+        target["auth"] = None
+        target["transport"] = None
@@ -61,8 +61,16 @@ export interface DeviceConfigDifferences {
 export interface DeviceConfigHistoryEntry {
   id: number;
   mac_address: string;
-  configuration: string;
   queried_at: string;
+  size?: number;
+  config_hash?: string;
+  lines_added?: number;
+  lines_deleted?: number;
+}
+
+export interface DeviceConfigHistoryPage {
+  items: DeviceConfigHistoryEntry[];
+  next_before_id: number | null;
 }
 
 const API_BASE_URL = 'http://localhost:8000';
@@ -354,10 +362,15 @@ export const fetchConfigDifferences = async (
 };
 
 export const fetchConfigHistory = async (
-  ip: string
-): Promise<DeviceConfigHistoryEntry[]> => {
+  ip: string,
+  beforeId?: number | null
+): Promise<DeviceConfigHistoryPage> => {
+  const cursor =
+    typeof beforeId === 'number'
+      ? `&before_id=${encodeURIComponent(beforeId)}`
+      : '';
   const response = await fetch(
-    `${API_BASE_URL}/devices/config/history?ip=${encodeURIComponent(ip)}`
+    `${API_BASE_URL}/devices/config/history?ip=${encodeURIComponent(ip)}${cursor}`
   );
 
   if (!response.ok) {
@@ -368,22 +381,53 @@ export const fetchConfigHistory = async (
   }
 
   const json = await response.json();
-  if (!Array.isArray(json)) {
-    return [];
+  const items = Array.isArray((json as any)?.items) ? (json as any).items : [];
+
+  return {
+    items: items.map((entry: unknown) => {
+      const record = entry as any;
+      return {
+        id: typeof record?.id === 'number' ? record.id : 0,
+        mac_address:
+          typeof record?.mac_address === 'string' ? record.mac_address : '',
+        queried_at:
+          typeof record?.queried_at === 'string' ? record.queried_at : '',
+        size: typeof record?.size === 'number' ? record.size : undefined,
+        config_hash:
+          typeof record?.config_hash === 'string' ? record.config_hash : undefined,
+        lines_added:
+          typeof record?.lines_added === 'number' ? record.lines_added : undefined,
+        lines_deleted:
+          typeof record?.lines_deleted === 'number'
+            ? record.lines_deleted
+            : undefined,
+      };
+    }),
+    next_before_id:
+      typeof (json as any)?.next_before_id === 'number'
+        ? (json as any).next_before_id
+        : null,
+  };
+};
+
+export const fetchConfigVersion = async (
+  ip: string,
+  archiveId: number
+): Promise<string> => {
+  const response = await fetch(
+    `${API_BASE_URL}/devices/config/history/${encodeURIComponent(
+      archiveId
+    )}?ip=${encodeURIComponent(ip)}&stream=true`
+  );
+
+  if (!response.ok) {
+    const detail = await response.text();
+    throw new Error(
+      `Unable to load archived config (${response.status}): ${detail ?? ''}`
+    );
   }
 
-  return json.map((entry) => {
-    const record = entry as any;
-    return {
-      id: typeof record?.id === 'number' ? record.id : 0,
-      mac_address:
-        typeof record?.mac_address === 'string' ? record.mac_address : '',
-      configuration:
-        typeof record?.configuration === 'string' ? record.configuration : '',
-      queried_at:
-        typeof record?.queried_at === 'string' ? record.queried_at : '',
-    };
-  });
+  return response.text();
 };
 
 export const fetchDeviceByIp = async (
@@ -1,8 +1,9 @@
-import React, { useEffect, useMemo, useState } from 'react';
+import React, { useEffect, useMemo, useRef, useState } from 'react';
 import {
   type DeviceRecord,
   fetchConfigDifferences,
   fetchConfigHistory,
+  fetchConfigVersion,
   type DeviceConfigDifferences,
   type DeviceConfigHistoryEntry,
 } from '../../../api/devices';
@@ -42,6 +43,15 @@ const DeviceTabConfigDiffs: React.FC<DeviceTabConfigDiffsProps> = ({
   const [historyError, setHistoryError] = useState<string | null>(null);
   const [historyIndex, setHistoryIndex] = useState(0);
   const [indexInput, setIndexInput] = useState('0');
+  const [nextBeforeId, setNextBeforeId] = useState<number | null>(null);
+  const [isLoadingMore, setIsLoadingMore] = useState(false);
+  // Archived config bodies are fetched on demand, keyed by archive id
+  const [configBodies, setConfigBodies] = useState<Record<number, string>>(
+    {}
+  );
+  const [bodyError, setBodyError] = useState<string | null>(null);
+  const currentIpRef = useRef(deviceIpLabel);
+  currentIpRef.current = deviceIpLabel;
 
   const maxIndex = historyEntries.length;
 
@@ -54,6 +64,8 @@ const DeviceTabConfigDiffs: React.FC<DeviceTabConfigDiffsProps> = ({
     if (!hasDeviceIp) {
       setDifferences(null);
       setHistoryEntries([]);
+      setNextBeforeId(null);
+      setConfigBodies({});
       setDiffError(null);
       setHistoryError(null);
       setIsLoading(false);
@@ -64,6 +76,8 @@ const DeviceTabConfigDiffs: React.FC<DeviceTabConfigDiffsProps> = ({
     setIsLoading(true);
     setDifferences(null);
     setHistoryEntries([]);
+    setNextBeforeId(null);
+    setConfigBodies({});
     setDiffError(null);
     setHistoryError(null);
 
@@ -87,7 +101,8 @@ const DeviceTabConfigDiffs: React.FC<DeviceTabConfigDiffsProps> = ({
         }
 
         if (historyResult.status === 'fulfilled') {
-          setHistoryEntries(historyResult.value);
+          setHistoryEntries(historyResult.value.items);
+          setNextBeforeId(historyResult.value.next_before_id);
         } else {
           setHistoryError(
             historyResult.reason instanceof Error
@@ -114,6 +129,36 @@ const DeviceTabConfigDiffs: React.FC<DeviceTabConfigDiffsProps> = ({
     }
   }, [historyIndex, maxIndex]);
 
+  // Load the next page of history metadata; results for a device that is no
+  // longer shown are dropped
+  const loadMoreHistory = () => {
+    if (!hasDeviceIp || nextBeforeId === null || isLoadingMore) {
+      return;
+    }
+
+    const requestedIp = deviceIpLabel;
+    setIsLoadingMore(true);
+    fetchConfigHistory(requestedIp, nextBeforeId)
+      .then((page) => {
+        if (currentIpRef.current !== requestedIp) {
+          return;
+        }
+        setHistoryEntries((entries) => [...entries, ...page.items]);
+        setNextBeforeId(page.next_before_id);
+      })
+      .catch((error) => {
+        if (currentIpRef.current === requestedIp) {
+          setHistoryError(
+            error instanceof Error
+              ? error.message
+              : 'Unable to load config history.'
+          );
+          setNextBeforeId(null);
+        }
+      })
+      .finally(() => setIsLoadingMore(false));
+  };
+
   const addedLineIndexes = useMemo(
     () => new Set(differences?.added_lines_indexes ?? []),
     [differences]
@@ -121,18 +166,63 @@ const DeviceTabConfigDiffs: React.FC<DeviceTabConfigDiffsProps> = ({
 
   const historyEntry =
     historyIndex > 0 ? historyEntries[historyIndex - 1] : null;
+  const historyBody = historyEntry ? configBodies[historyEntry.id] : undefined;
 
-  const rightPaneError = historyIndex === 0 ? diffError : historyError;
+  // Fetch the body of the selected archived config the first time it is shown
+  useEffect(() => {
+    if (!historyEntry || historyBody !== undefined) {
+      return;
+    }
+
+    let isActive = true;
+    setBodyError(null);
+    fetchConfigVersion(deviceIpLabel, historyEntry.id)
+      .then((body) => {
+        if (isActive) {
+          setConfigBodies((bodies) => ({
+            ...bodies,
+            [historyEntry.id]: body,
+          }));
+        }
+      })
+      .catch((error) => {
+        if (isActive) {
+          setBodyError(
+            error instanceof Error
+              ? error.message
+              : 'Unable to load archived config.'
+          );
+        }
+      });
+
+    return () => {
+      isActive = false;
+    };
+  }, [deviceIpLabel, historyEntry, historyBody]);
+
+  const rightPaneError =
+    historyIndex === 0 ? diffError : historyError ?? bodyError;
 
   const rightPaneLines =
     historyIndex === 0
       ? differences?.deleted_lines ?? []
-      : normalizeConfigLines(historyEntry?.configuration ?? '');
+      : normalizeConfigLines(historyBody ?? '');
+
+  const historySummary =
+    historyEntry &&
+    typeof historyEntry.lines_added === 'number' &&
+    typeof historyEntry.lines_deleted === 'number'
+      ? ` | +${historyEntry.lines_added} / -${historyEntry.lines_deleted}`
+      : '';
 
   const updateHistoryIndex = (nextIndex: number) => {
     const clamped = Math.min(Math.max(nextIndex, 0), maxIndex);
     setHistoryIndex(clamped);
     setIndexInput(String(clamped));
+    setBodyError(null);
+    if (clamped >= maxIndex) {
+      loadMoreHistory();
+    }
   };
 
   const handleIndexCommit = () => {
@@ -218,7 +308,7 @@ const DeviceTabConfigDiffs: React.FC<DeviceTabConfigDiffsProps> = ({
                   {historyIndex === 0
                     ? 'Lines removed from the current config.'
                     : historyEntry
-                    ? `ID ${historyEntry.id} | ${historyEntry.queried_at}`
+                    ? `ID ${historyEntry.id} | ${historyEntry.queried_at}${historySummary}`
                     : 'Select a history entry to view.'}
                 </p>
               </div>
@@ -244,6 +334,7 @@ const DeviceTabConfigDiffs: React.FC<DeviceTabConfigDiffsProps> = ({
                   />
                   <span className="config-pane__index-total">
                     / {maxIndex}
+                    {nextBeforeId !== null ? '+' : ''}
                   </span>
                 </div>
                 <button
@@ -264,6 +355,8 @@ const DeviceTabConfigDiffs: React.FC<DeviceTabConfigDiffsProps> = ({
                 <p className="muted-text">
                   {historyIndex === 0
                     ? 'No removed lines found.'
+                    : historyEntry && historyBody === undefined
+                    ? 'Loading archived config...'
                     : 'No archived config available.'}
                 </p>
               </div>